@@ -0,0 +1,27 @@
+"""Clear the content of failed outbox emails
+
+Revision ID: a325e6cd5183
+Revises: 13fb88a11838
+Create Date: 2026-10-18 11:50:52.785584
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'a325e6cd5183'
+down_revision = '13fb88a11838'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Failed emails are never retried, drop the rendered emails they kept
+    op.execute("UPDATE emailoutbox SET html_content = '' WHERE status = 'failed'")
+
+
+def downgrade():
+    # The cleared content cannot be restored
+    pass
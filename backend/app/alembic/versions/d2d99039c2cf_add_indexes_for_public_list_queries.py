@@ -0,0 +1,43 @@
+"""Add indexes for public list queries
+
+Revision ID: d2d99039c2cf
+Revises: 9f547fece84b
+Create Date: 2026-10-18 10:04:12.418207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2d99039c2cf'
+down_revision = '9f547fece84b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY does not lock out writes but cannot run
+    # inside a transaction block. A build that fails leaves an INVALID index
+    # behind, so each index is dropped first and a retry rebuilds it.
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_post_group_id_created_at', table_name='post', postgresql_concurrently=True, if_exists=True)
+        op.create_index('ix_post_group_id_created_at', 'post', ['group_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_post_group_id_created_at_visible', table_name='post', postgresql_concurrently=True, if_exists=True)
+        op.create_index('ix_post_group_id_created_at_visible', 'post', ['group_id', 'created_at', 'id'], unique=False, postgresql_where=sa.text('is_visible = true'), postgresql_concurrently=True)
+        op.drop_index('ix_event_start_visible', table_name='event', postgresql_concurrently=True, if_exists=True)
+        op.create_index('ix_event_start_visible', 'event', ['start', 'id'], unique=False, postgresql_where=sa.text('is_visible = true'), postgresql_concurrently=True)
+        op.drop_index(op.f('ix_lecture_post_id'), table_name='lecture', postgresql_concurrently=True, if_exists=True)
+        op.create_index(op.f('ix_lecture_post_id'), 'lecture', ['post_id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_lecture_start_visible', table_name='lecture', postgresql_concurrently=True, if_exists=True)
+        op.create_index('ix_lecture_start_visible', 'lecture', ['start', 'id'], unique=False, postgresql_where=sa.text('is_visible = true'), postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_lecture_start_visible', table_name='lecture', postgresql_concurrently=True, if_exists=True)
+        op.drop_index(op.f('ix_lecture_post_id'), table_name='lecture', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_event_start_visible', table_name='event', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_post_group_id_created_at_visible', table_name='post', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_post_group_id_created_at', table_name='post', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,160 @@
+import hashlib
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, TypeVar
+
+from fastapi import Request, Response
+from sqlalchemy import Select
+from sqlalchemy.orm import Mapped, Session
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import func
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.api.pagination import Keyset, Page, Paginated, count_rows, page_window
+
+T = TypeVar("T")
+
+
+@dataclass
+class Validators:
+    """
+    `ETag` and `Last-Modified` of a response, computed from the version
+    columns (ids and `last_updated`) of the rows it is built from instead of
+    from its body.
+    """
+
+    etag: str
+    last_modified: datetime | None = None
+
+    @classmethod
+    def of(cls, *parts: Any, last_modified: datetime | None = None) -> "Validators":
+        digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+        # Weak, the same rows may be sent with different content encodings
+        return cls(etag=f'W/"{digest}"', last_modified=last_modified)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(
+                _as_utc(self.last_modified), usegmt=True
+            )
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """
+        Whether the copy the client already has is still current.
+        `If-None-Match` takes precedence over `If-Modified-Since`.
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, self.etag)
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have a one second resolution
+        return _as_utc(self.last_modified).replace(microsecond=0) <= since
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, only the opaque part of the tags is compared
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def _as_utc(value: datetime) -> datetime:
+    # `last_updated` columns are naive and hold the server time, which is UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def is_conditional(request: Request, *, last_modified: bool = True) -> bool:
+    """
+    Whether the request carries a validator. Only then is it worth looking up
+    the version of the response before building it, otherwise the validators
+    are computed from the rows loaded for the response.
+    """
+    if "if-none-match" in request.headers:
+        return True
+    return last_modified and "if-modified-since" in request.headers
+
+
+def version_validators(
+    version: Sequence[Any], *, last_modified: bool = True
+) -> Validators:
+    """
+    Validators of a single row response from the values of its version
+    columns. `last_modified=False` leaves out `Last-Modified`, for responses
+    that include child rows whose deletion it would not reflect.
+    """
+    latest = None
+    if last_modified:
+        latest = max(
+            (value for value in version if isinstance(value, datetime)), default=None
+        )
+    return Validators.of(*version, last_modified=latest)
+
+
+def row_validators(
+    session: Session, statement: Select[Any], *, last_modified: bool = True
+) -> Validators | None:
+    """
+    Validators of a single row response, `None` if `statement` finds no row.
+    """
+    version = session.execute(statement).first()
+    if version is None:
+        return None
+    return version_validators(tuple(version), last_modified=last_modified)
+
+
+def page_validators(
+    session: Session,
+    statement: SelectOfScalar[Any],
+    page: Page,
+    keyset: Keyset,
+    columns: Sequence[Mapped[Any] | ColumnElement[Any]],
+) -> Validators:
+    """
+    Validators of a list response, computed by running the page query of
+    `statement` with only its version `columns` to answer a conditional
+    request without loading the page.
+
+    There is no `Last-Modified`, deleting a row does not move the latest
+    `last_updated` forward so it cannot tell whether a page changed.
+    """
+    window = page_window(statement.with_only_columns(*columns), page, keyset)
+    count = None
+    if page.count == "exact" and not page.after:
+        results = session.execute(window.add_columns(func.count().over())).all()
+        versions = [tuple(row[:-1]) for row in results]
+        if results:
+            count = results[0][-1]
+    else:
+        versions = [tuple(row) for row in session.execute(window).all()]
+    if page.count == "exact" and count is None:
+        count = count_rows(session, statement)
+    return Validators.of(versions[: page.limit], count, len(versions) > page.limit)
+
+
+def loaded_page_validators(
+    result: Paginated[T], page: Page, version: Callable[[T], tuple[Any, ...]]
+) -> Validators:
+    """
+    Validators of a list response from the page already loaded for it, equal
+    to the ones of `page_validators` as long as `version` returns the values
+    of its version columns.
+    """
+    count = result.count if page.count == "exact" else None
+    return Validators.of([version(row) for row in result.rows], count, result.has_more)
@@ -1,4 +1,5 @@
-from collections.abc import Generator
+import time
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 
 import jwt
@@ -6,11 +7,15 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
+from sqlalchemy.orm import make_transient_to_detached
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import security
+from app.core.cache import token_cache, user_cache
 from app.core.config import settings
-from app.core.db import engine
+from app.core.db import async_engine, engine
+from app.core.revocation import revocation_list
 from app.models import TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -24,22 +29,79 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    # Nothing is lazy loaded once the response is being serialized
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str | None, Depends(reusable_oauth2)]
 
 
+def decode_token(token: str) -> TokenPayload:
+    """
+    Claims of `token`, remembered until it expires.
+    """
+    cached = token_cache.get(token)
+    if cached is not None and cached[1] > time.time():
+        return cached[0]
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+    token_data = TokenPayload(**payload)
+    token_cache.set(token, (token_data, float(payload.get("exp", 0))))
+    return token_data
+
+
+def _detached_copy(user: User) -> User:
+    copy = User(**user.model_dump())
+    make_transient_to_detached(copy)
+    return copy
+
+
+def get_user(session: Session, user_id: str | None) -> User | None:
+    """
+    Load a user through `user_cache`.
+
+    The cached row is shared between requests, each one gets its own copy
+    merged into its session without querying the database.
+    """
+    if user_id is None:
+        return None
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return session.merge(cached, load=False)
+    user = session.get(User, user_id)
+    if user is not None:
+        user_cache.set(user_id, _detached_copy(user))
+    return user
+
+
+async def get_user_async(session: AsyncSession, user_id: str | None) -> User | None:
+    if user_id is None:
+        return None
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return await session.merge(cached, load=False)
+    user = await session.get(User, user_id)
+    if user is not None:
+        user_cache.set(user_id, _detached_copy(user))
+    return user
+
+
 def get_current_user(session: SessionDep, token: TokenDep) -> User:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
+        if token is None:
+            raise InvalidTokenError("Not authenticated")
+        token_data = decode_token(token)
+        if token_data.jti and revocation_list.is_revoked(session, token_data.jti):
+            raise InvalidTokenError("Revoked token")
     except (InvalidTokenError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
+    user = get_user(session, token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
@@ -49,19 +111,51 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
-def get_current_user_optional(
-    session: SessionDep, token: TokenDep
+
+async def get_current_user_async(session: AsyncSessionDep, token: TokenDep) -> User:
+    """
+    `get_current_user` for async routes, the user belongs to their
+    `AsyncSessionDep`.
+    """
+    try:
+        if token is None:
+            raise InvalidTokenError("Not authenticated")
+        token_data = decode_token(token)
+        if token_data.jti is not None and await session.run_sync(
+            revocation_list.is_revoked, token_data.jti
+        ):
+            raise InvalidTokenError("Revoked token")
+    except (InvalidTokenError, ValidationError):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+    user = await get_user_async(session, token_data.sub)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
+
+CurrentUserAsync = Annotated[User, Depends(get_current_user_async)]
+
+
+async def get_current_user_optional(
+    session: AsyncSessionDep, token: TokenDep
 ) -> User | None:
     if token is None:
         return None  # No token provided, allow access as guest
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
+        token_data = decode_token(token)
     except (InvalidTokenError, ValidationError):
         return None  # Invalid token, treat as unauthenticated user
-    user = session.get(User, token_data.sub)
+    revoked = token_data.jti is not None and await session.run_sync(
+        revocation_list.is_revoked, token_data.jti
+    )
+    if revoked:
+        return None  # Logged out, treat as guest
+    user = await get_user_async(session, token_data.sub)
     if not user or not user.is_active:
         return None  # User not found or inactive, treat as guest
     return user
@@ -0,0 +1,69 @@
+from collections.abc import Sequence
+from typing import Literal
+
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from sqlalchemy.orm.interfaces import LoaderOption
+from sqlmodel import SQLModel
+
+from app.models import (
+    Event,
+    EventsSummary,
+    Post,
+    PostPublic,
+    PostsPublic,
+    PostsSummary,
+)
+
+# full: every column and relationship of the public model
+# summary: the columns of the card shown in lists, the text is never read
+View = Literal["full", "summary"]
+
+# Relationships serialized by each response model and how to fetch them.
+# Many-to-one relations are joined into the main query, collections are
+# fetched with one extra `SELECT ... WHERE id IN (...)` for the whole page,
+# so a list response costs a fixed number of round trips whatever its size.
+_post_public_options: tuple[LoaderOption, ...] = (
+    joinedload(Post.group),  # type: ignore[arg-type]
+    selectinload(Post.lectures),  # type: ignore[arg-type]
+)
+
+LOADER_OPTIONS: dict[type[SQLModel], Sequence[LoaderOption]] = {
+    PostPublic: _post_public_options,
+    PostsPublic: _post_public_options,
+    # Summaries select only their own columns plus the sort key of the keyset
+    # and `last_updated` for their ETag, touching any other attribute raises
+    # instead of loading it
+    PostsSummary: (
+        load_only(
+            Post.id,  # type: ignore[arg-type]
+            Post.title,  # type: ignore[arg-type]
+            Post.image,  # type: ignore[arg-type]
+            Post.is_visible,  # type: ignore[arg-type]
+            Post.group_id,  # type: ignore[arg-type]
+            Post.created_at,  # type: ignore[arg-type]
+            Post.last_updated,  # type: ignore[arg-type]
+            raiseload=True,
+        ),
+    ),
+    EventsSummary: (
+        load_only(
+            Event.id,  # type: ignore[arg-type]
+            Event.title,  # type: ignore[arg-type]
+            Event.image,  # type: ignore[arg-type]
+            Event.is_visible,  # type: ignore[arg-type]
+            Event.start,  # type: ignore[arg-type]
+            Event.end,  # type: ignore[arg-type]
+            Event.location,  # type: ignore[arg-type]
+            Event.last_updated,  # type: ignore[arg-type]
+            raiseload=True,
+        ),
+    ),
+}
+
+
+def loader_options(response_model: type[SQLModel]) -> Sequence[LoaderOption]:
+    """
+    Return the loader options needed to serialize `response_model` without
+    lazy loading any of its relationships.
+    """
+    return LOADER_OPTIONS.get(response_model, ())
@@ -0,0 +1,254 @@
+import time
+from collections.abc import Callable, Collection
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.conditional import etag_matches
+from app.core.cache import CachedResponse, ResponseCache
+from app.core.compression import (
+    compress,
+    compressible,
+    encoded_headers,
+    negotiate,
+    vary,
+)
+from app.core.metrics import (
+    db_duration,
+    db_statements,
+    request_duration,
+    requests_in_flight,
+)
+from app.core.querystats import QueryStats, current_query_stats
+
+
+class PublicCacheMiddleware:
+    """
+    Serve anonymous GET requests of the given namespaces from `cache`.
+
+    Requests carrying an `Authorization` header always reach the route, as
+    logged in users may see rows that are hidden from the public.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        cache: ResponseCache,
+        prefix: str,
+        namespaces: Collection[str],
+    ) -> None:
+        self.app = app
+        self.cache = cache
+        self.prefix = prefix
+        self.namespaces = frozenset(namespaces)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not scope["path"].startswith(self.prefix)
+            or any(name == b"authorization" for name, _ in scope["headers"])
+        ):
+            await self.app(scope, receive, send)
+            return
+        namespace = scope["path"][len(self.prefix) :].strip("/").split("/")[0]
+        if namespace not in self.namespaces:
+            await self.app(scope, receive, send)
+            return
+
+        query = urlencode(sorted(parse_qsl(scope["query_string"].decode())))
+        key = (namespace, scope["path"].rstrip("/"), query)
+        cached = self.cache.get(key)
+        if cached is not None:
+            if self.not_modified(scope, cached):
+                # Only the validators are repeated on a 304
+                headers = [
+                    (name, value)
+                    for name, value in cached.headers
+                    if name in (b"etag", b"last-modified")
+                ]
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": 304,
+                        "headers": [*headers, (b"x-cache", b"HIT")],
+                    }
+                )
+                await send({"type": "http.response.body", "body": b""})
+                return
+            scope["route"] = cached.route
+            await self.send_cached(scope, send, cached, b"HIT")
+            return
+
+        generation = self.cache.generation(namespace)
+        start: Message = {}
+        chunks: list[bytes] = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                if start["status"] != 200:
+                    await send(
+                        {
+                            **message,
+                            "headers": [
+                                *message.get("headers", []),
+                                (b"x-cache", b"MISS"),
+                            ],
+                        }
+                    )
+                return
+            if message["type"] == "http.response.body" and start["status"] == 200:
+                # Held back so that the stored and the sent bodies are
+                # compressed once
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                response = CachedResponse(
+                    status=start["status"],
+                    headers=list(start.get("headers", [])),
+                    body=b"".join(chunks),
+                    route=scope.get("route"),
+                )
+                if compressible(response.headers, len(response.body)):
+                    response.headers = vary(response.headers)
+                self.cache.set(key, response, generation)
+                await self.send_cached(scope, send, response, b"MISS")
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    async def send_cached(
+        scope: Scope, send: Send, cached: CachedResponse, status: bytes
+    ) -> None:
+        headers, body = cached.headers, cached.body
+        accept_encoding = dict(scope["headers"]).get(b"accept-encoding")
+        if accept_encoding and compressible(headers, len(body)):
+            encoding = negotiate(accept_encoding.decode("latin-1"))
+            if encoding is not None:
+                headers, body = cached.encode(encoding)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": cached.status,
+                "headers": [*headers, (b"x-cache", status)],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    def not_modified(scope: Scope, cached: CachedResponse) -> bool:
+        headers = dict(scope["headers"])
+        etag = dict(cached.headers).get(b"etag")
+        if b"if-none-match" not in headers or etag is None:
+            return False
+        return etag_matches(headers[b"if-none-match"].decode(), etag.decode())
+
+
+class CompressionMiddleware:
+    """
+    Compress large enough text responses with the best coding the client
+    accepts.
+
+    Responses that already carry a `Content-Encoding`, such as the ones
+    served by `PublicCacheMiddleware` from their stored compressed copy, and
+    streamed responses are sent as they are.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = dict(scope["headers"]).get(b"accept-encoding")
+        encoding = (
+            negotiate(accept_encoding.decode("latin-1")) if accept_encoding else None
+        )
+        start: Message = {}
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] == "http.response.body" and start:
+                headers = list(start.get("headers", []))
+                body = message.get("body", b"")
+                if not message.get("more_body", False) and compressible(
+                    headers, len(body)
+                ):
+                    headers = vary(headers)
+                    if encoding is not None:
+                        body = compress(body, encoding)
+                        headers = encoded_headers(headers, encoding, len(body))
+                    message = {**message, "body": body}
+                await send({**start, "headers": headers})
+                start = {}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class MetricsMiddleware:
+    """
+    Record the duration of every HTTP request and the statements it sent to
+    the database, labeled by the unique id of the route that handled it.
+
+    The database time is also sent to the client in a `Server-Timing` header.
+    """
+
+    def __init__(self, app: ASGIApp, *, route_id: Callable[[APIRoute], str]) -> None:
+        self.app = app
+        self.route_id = route_id
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+        stats = QueryStats(request=f"{scope['method']} {scope['path']}")
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                timing = (
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries", '
+                    f"total;dur={(time.perf_counter() - start) * 1000:.1f}"
+                )
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"server-timing", timing.encode()),
+                    ],
+                }
+            await send(message)
+
+        requests_in_flight.inc()
+        token = current_query_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            requests_in_flight.dec()
+            route = self.route_label(scope)
+            request_duration.observe((route, str(status)), time.perf_counter() - start)
+            db_statements.observe((route,), stats.count)
+            db_duration.observe((route,), stats.seconds)
+
+    def route_label(self, scope: Scope) -> str:
+        # Set by the router, or by `PublicCacheMiddleware` for a cached response
+        route = scope.get("route")
+        if isinstance(route, APIRoute):
+            return self.route_id(route)
+        # Unknown paths and CORS preflights share one series instead of one per URL
+        return "unmatched"
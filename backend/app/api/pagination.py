@@ -0,0 +1,178 @@
+import base64
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Annotated, Any, Generic, Literal, TypeVar, cast
+
+from fastapi import Depends, HTTPException, Query
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import to_jsonable_python
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute, Mapped, Session
+from sqlmodel import func, select
+from sqlmodel.sql.expression import SelectOfScalar
+
+T = TypeVar("T")
+S = TypeVar("S", bound=Select[Any])
+
+# exact: `count(*) OVER ()` computed by the page query itself
+# estimated: the planner's row estimate, no scan of the matching rows
+# none: no count at all, `has_more` tells whether there is a next page
+CountStrategy = Literal["exact", "estimated", "none"]
+
+MAX_PAGE_SIZE = 1000
+
+
+@dataclass
+class Page:
+    mode: Literal["offset", "cursor"]
+    skip: int
+    limit: int
+    after: str | None
+    count: CountStrategy
+
+
+def get_page(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    pagination: Literal["offset", "cursor"] = "offset",
+    after: str | None = None,
+    count: CountStrategy = "exact",
+) -> Page:
+    # Passing a cursor implies cursor mode, `pagination=cursor` asks for the first page
+    mode: Literal["offset", "cursor"] = "cursor" if after else pagination
+    return Page(mode=mode, skip=skip, limit=limit, after=after, count=count)
+
+
+PageDep = Annotated[Page, Depends(get_page)]
+
+
+class Keyset:
+    """
+    Stable `(sort key, id)` ordering of a list endpoint.
+
+    In cursor mode the page starts right after the row encoded in the opaque
+    `after` token, so Postgres seeks to it instead of scanning and discarding
+    every skipped row like OFFSET does.
+    """
+
+    def __init__(
+        self, key: Mapped[Any], id: Mapped[Any], *, descending: bool = False
+    ) -> None:
+        # Model columns as returned by `col()`
+        self.key = cast(InstrumentedAttribute[Any], key)
+        self.id = cast(InstrumentedAttribute[Any], id)
+        self.descending = descending
+        # Cursor values are decoded back to the types declared on the model
+        fields = self.key.class_.model_fields
+        self._adapters: tuple[TypeAdapter[Any], TypeAdapter[Any]] = (
+            TypeAdapter(fields[self.key.key].annotation),
+            TypeAdapter(fields[self.id.key].annotation),
+        )
+
+    def encode(self, row: Any) -> str:
+        value = [getattr(row, self.key.key), getattr(row, self.id.key)]
+        data = json.dumps(to_jsonable_python(value), separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> tuple[Any, Any]:
+        try:
+            data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            key, id = json.loads(data)
+            return (
+                self._adapters[0].validate_python(key),
+                self._adapters[1].validate_python(id),
+            )
+        except (ValueError, TypeError, ValidationError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    def apply(self, statement: S, after: str | None) -> S:
+        if after:
+            position = tuple_(self.key, self.id)
+            bound = self.decode(after)
+            statement = statement.where(
+                position < bound if self.descending else position > bound
+            )
+        if self.descending:
+            return statement.order_by(self.key.desc(), self.id.desc())
+        return statement.order_by(self.key, self.id)
+
+
+@dataclass
+class Paginated(Generic[T]):
+    rows: Sequence[T]
+    count: int | None
+    has_more: bool
+    next_cursor: str | None
+
+
+def count_rows(session: Session, statement: SelectOfScalar[Any]) -> int:
+    count_statement = select(func.count()).select_from(
+        statement.order_by(None).subquery()
+    )
+    return session.execute(count_statement).scalar_one()
+
+
+def estimate_rows(session: Session, statement: SelectOfScalar[Any]) -> int:
+    """
+    Return the planner's estimate of the number of rows matched by
+    `statement`, derived from `pg_class.reltuples` and the column statistics.
+    """
+    compiled = statement.compile(
+        dialect=session.get_bind().dialect,
+        compile_kwargs={"render_postcompile": True},
+    )
+    plan = (
+        session.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        .scalar_one()
+    )
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def page_window(statement: S, page: Page, keyset: Keyset) -> S:
+    # Both modes share the keyset order, OFFSET alone pages through the rows
+    # in whatever order Postgres returns them
+    if page.mode == "offset":
+        statement = keyset.apply(statement, None).offset(page.skip)
+    else:
+        statement = keyset.apply(statement, page.after)
+    # One extra row tells whether there is a next page
+    return statement.limit(page.limit + 1)
+
+
+def paginate(
+    session: Session, statement: SelectOfScalar[T], page: Page, keyset: Keyset
+) -> Paginated[T]:
+    """
+    Fetch one page of `statement` and count the rows it matches using the
+    strategy picked by the caller.
+
+    Async routes run it through `AsyncSession.run_sync`.
+    """
+    window = page_window(statement, page, keyset)
+
+    count = None
+    rows: Sequence[T]
+    # Past a cursor the window function only sees the remaining rows
+    if page.count == "exact" and not page.after:
+        results = session.execute(window.add_columns(func.count().over())).all()
+        rows = [row for row, _ in results]
+        if results:
+            count = results[0][1]
+        elif page.mode == "cursor" or page.skip == 0:
+            count = 0
+    else:
+        rows = session.execute(window).scalars().all()
+
+    if page.count == "exact" and count is None:
+        count = count_rows(session, statement)
+    elif page.count == "estimated":
+        count = estimate_rows(session, statement)
+
+    has_more = len(rows) > page.limit
+    rows = rows[: page.limit]
+    next_cursor = None
+    if page.mode == "cursor" and has_more:
+        next_cursor = keyset.encode(rows[-1])
+    return Paginated(rows=rows, count=count, has_more=has_more, next_cursor=next_cursor)
@@ -0,0 +1,61 @@
+from collections.abc import Mapping
+from typing import Generic, TypeVar
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.models import (
+    EventPublic,
+    EventsPublic,
+    EventsSummary,
+    LecturePublic,
+    LecturesPublic,
+    PostPublic,
+    PostsPublic,
+    PostsSummary,
+)
+
+T = TypeVar("T")
+
+
+class Serializer(Generic[T]):
+    """
+    JSON encoder of one response model, built once at import.
+
+    A route returning a model lets FastAPI dump it to a dict, validate that
+    dict against `response_model` again and encode the result. A route that
+    already built the public model returns `serializer.response(value)`
+    instead, which writes the JSON straight from the model in a single pass.
+    The route keeps its `response_model` for the OpenAPI schema.
+    """
+
+    def __init__(self, model: type[T]) -> None:
+        self.model = model
+        self.adapter: TypeAdapter[T] = TypeAdapter(model)
+
+    def validate(self, value: object) -> T:
+        """
+        Build the public model from an ORM object, dropping the fields it does
+        not expose.
+        """
+        return self.adapter.validate_python(value, from_attributes=True)
+
+    def dump(self, value: T) -> bytes:
+        return self.adapter.dump_json(value)
+
+    def response(
+        self, value: T, *, headers: Mapping[str, str] | None = None
+    ) -> Response:
+        return Response(
+            content=self.dump(value), media_type="application/json", headers=headers
+        )
+
+
+posts_public = Serializer(PostsPublic)
+posts_summary = Serializer(PostsSummary)
+post_public = Serializer(PostPublic)
+events_public = Serializer(EventsPublic)
+events_summary = Serializer(EventsSummary)
+event_public = Serializer(EventPublic)
+lectures_public = Serializer(LecturesPublic)
+lecture_public = Serializer(LecturePublic)
@@ -1,26 +1,89 @@
-from fastapi import APIRouter, HTTPException
+from typing import Any
 
+from fastapi import APIRouter, HTTPException, Request
+
+from app import crud
+from app.api.deps import SessionDep
 from app.core.config import settings
-from app.models import ContactForm, ContactFormBase
-from app.utils import generate_contact_request_email, send_email
+from app.core.outbox import queue_email
+from app.core.ratelimit import RateLimiter
+from app.models import ContactFormBase, ContactFormPublic
+from app.utils import generate_contact_request_email
+
 router = APIRouter()
 
-@router.post("/", response_model=ContactForm)
-def contact(*, contact_form_in: ContactFormBase):
-    """Send a mail with the contact request.
+# Per worker, a deployment with n workers accepts up to n times as many
+ip_limiter = RateLimiter(
+    "contact_ip",
+    rate=settings.CONTACT_RATE_LIMIT_PER_HOUR / 3600,
+    burst=settings.CONTACT_RATE_LIMIT_BURST,
+    maxsize=10_000,
+)
+email_limiter = RateLimiter(
+    "contact_email",
+    rate=settings.CONTACT_RATE_LIMIT_PER_HOUR / 3600,
+    burst=settings.CONTACT_RATE_LIMIT_BURST,
+    maxsize=10_000,
+)
+
+
+def client_ip(request: Request) -> str:
+    """
+    The address of the client, as seen by the first trusted proxy.
+    """
+    hops = settings.FORWARDED_PROXY_HOPS
+    if hops:
+        forwarded = [
+            address.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for address in header.split(",")
+            if address.strip()
+        ]
+        # Earlier addresses are whatever the client sent, not trusted
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+@router.post("/", response_model=ContactFormPublic, status_code=202)
+def contact(
+    *, session: SessionDep, request: Request, contact_form_in: ContactFormBase
+) -> Any:
+    """Store a contact request and queue the mail sent for it.
+
+    The same message sent again by the same email within a day is accepted
+    but not stored or sent twice.
 
     Args:
         contact_form_in (ContactFormBase)
     """
-    
-    contact_form = ContactForm.model_validate(contact_form_in)
-    
-    assert settings.emails_enabled, "Emails are not enabled! Set up the SMTP configuration."
-    email_data = generate_contact_request_email(contact_form=contact_form)
-    send_email(
-        email_to=settings.FIRST_SUPERUSER,
-        subject=email_data.subject,
-        html_content=email_data.html_content
+    for limiter, key in (
+        (ip_limiter, client_ip(request)),
+        (email_limiter, contact_form_in.email.strip().lower()),
+    ):
+        retry_after = limiter.acquire(key)
+        if retry_after:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many contact requests",
+                headers={"Retry-After": str(retry_after)},
+            )
+
+    contact_form, created = crud.create_contact_form(
+        session=session, contact_form_in=contact_form_in
     )
-    
-    return contact_form
\ No newline at end of file
+    if not created:
+        return contact_form
+    if settings.emails_enabled:
+        email_data = generate_contact_request_email(contact_form=contact_form)
+        # Commits the request and its email together
+        queue_email(
+            session=session,
+            email_to=settings.FIRST_SUPERUSER,
+            subject=email_data.subject,
+            html_content=email_data.html_content,
+        )
+    else:
+        session.commit()
+    session.refresh(contact_form)
+    return contact_form
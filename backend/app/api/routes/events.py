@@ -3,46 +3,118 @@ import logging
 from typing import Any
 from datetime import datetime
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, HTTPException, Request
+from sqlmodel import col, select
 
-from app.api.deps import CurrentUser, CurrentUserOptional, SessionDep
-from app.models import Event, EventCreate, EventUpdate, EventPublic, EventsPublic, Message
+from app.api.conditional import (
+    is_conditional,
+    loaded_page_validators,
+    page_validators,
+    row_validators,
+    version_validators,
+)
+from app.api.deps import (
+    AsyncSessionDep,
+    CurrentUser,
+    CurrentUserOptional,
+    SessionDep,
+)
+from app.api.loaders import View, loader_options
+from app.api.pagination import Keyset, PageDep, paginate
+from app.api.responses import event_public, events_public, events_summary
+from app.core.cache import response_cache
+from app.models import Event, EventCreate, EventUpdate, EventPublic, EventsPublic, EventsSummary, Message
 
 router = APIRouter()
 
+version_columns = (col(Event.id), col(Event.last_updated))
 
-@router.get("/", response_model=EventsPublic)
-def read_events(
-    session: SessionDep, currentUser: CurrentUserOptional, skip: int = 0, limit: int = 100
+
+def version(event: Event) -> tuple[Any, ...]:
+    return (event.id, event.last_updated)
+
+keyset = Keyset(col(Event.start), col(Event.id), descending=True)
+
+
+@router.get("/", response_model=EventsPublic | EventsSummary)
+async def read_events(
+    session: AsyncSessionDep,
+    currentUser: CurrentUserOptional,
+    page: PageDep,
+    request: Request,
+    view: View = "full",
 ) -> Any:
     """
     Retrieve events.
+
+    `view=summary` returns only the fields of the event cards, without their
+    text.
     """
 
-    count_statement = select(func.count()).select_from(Event)
     statement = select(Event)
     if currentUser == None:
-        count_statement = count_statement.where(Event.is_visible == True)
         statement = statement.where(Event.is_visible == True)
-    
-    statement = statement.offset(skip).limit(limit)
-    count = session.exec(count_statement).one()
-    events = session.exec(statement).all()
-    
 
-    return EventsPublic(events=events, count=count)
+    if is_conditional(request, last_modified=False):
+        validators = await session.run_sync(
+            page_validators, statement, page, keyset, version_columns
+        )
+        if validators.matches(request):
+            return validators.not_modified()
+
+    if view == "summary":
+        summaries = await session.run_sync(
+            paginate, statement.options(*loader_options(EventsSummary)), page, keyset
+        )
+        return events_summary.response(
+            EventsSummary(
+                events=summaries.rows,
+                count=summaries.count,
+                has_more=summaries.has_more,
+                next_cursor=summaries.next_cursor,
+            ),
+            headers=loaded_page_validators(summaries, page, version).headers,
+        )
+
+    result = await session.run_sync(paginate, statement, page, keyset)
+
+    return events_public.response(
+        EventsPublic(
+            events=result.rows,
+            count=result.count,
+            has_more=result.has_more,
+            next_cursor=result.next_cursor,
+        ),
+        headers=loaded_page_validators(result, page, version).headers,
+    )
 
 
 @router.get("/{id}", response_model=EventPublic)
-def read_event(session: SessionDep, currentUser: CurrentUserOptional, id:int) -> Any:
+async def read_event(
+    session: AsyncSessionDep,
+    currentUser: CurrentUserOptional,
+    id: int,
+    request: Request,
+) -> Any:
     """
     Get event by ID.
     """
-    event = session.get(Event, id)
-    if not event or (currentUser == None and not event.post.is_visible):
+    if is_conditional(request):
+        statement = select(*version_columns).where(Event.id == id)
+        if currentUser is None:
+            statement = statement.where(Event.is_visible == True)
+        validators = await session.run_sync(row_validators, statement)
+        if validators is None:
+            raise HTTPException(status_code=404, detail="Event not found")
+        if validators.matches(request):
+            return validators.not_modified()
+
+    event = await session.get(Event, id)
+    if not event or (currentUser is None and not event.is_visible):
         raise HTTPException(status_code=404, detail="Event not found")
-    return event
+    return event_public.response(
+        event_public.validate(event), headers=version_validators(version(event)).headers
+    )
 
 
 @router.post("/", response_model=Event)
@@ -61,6 +133,7 @@ def create_event(
     
     session.add(event)
     session.commit()
+    response_cache.invalidate("events")
     session.refresh(event)
     return event
 
@@ -83,6 +156,7 @@ def update_event(
     event.sqlmodel_update(update_dict, update={"updated_by": current_user.id, "last_updated": datetime.now()})
     session.add(event)
     session.commit()
+    response_cache.invalidate("events")
     session.refresh(event)
     return event
 
@@ -99,5 +173,6 @@ def delete_event(
         raise HTTPException(status_code=404, detail="Event not found")
     session.delete(event)
     session.commit()
+    response_cache.invalidate("events")
     logging.info(f"Event {id} deleted by {current_user.email}")
     return Message(message="Event deleted successfully")
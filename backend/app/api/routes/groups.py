@@ -5,7 +5,13 @@ from datetime import datetime
 from fastapi import APIRouter, HTTPException
 from sqlmodel import func, select, update
 
-from app.api.deps import CurrentUser, CurrentUserOptional, SessionDep
+from app.api.deps import (
+    AsyncSessionDep,
+    CurrentUser,
+    CurrentUserOptional,
+    SessionDep,
+)
+from app.core.cache import response_cache
 from app.models import Group, GroupBase, GroupPublic, GroupsPublic, Message
 
 
@@ -13,8 +19,8 @@ router = APIRouter()
 
 
 @router.get("/", response_model=GroupsPublic)
-def read_groups(
-    session: SessionDep, currentUser: CurrentUserOptional
+async def read_groups(
+    session: AsyncSessionDep, currentUser: CurrentUserOptional
 ) -> Any:
     """
     Retrieve groups.
@@ -22,18 +28,20 @@ def read_groups(
     
     count_statement = select(func.count()).select_from(Group)
     statement = select(Group)
-    count = session.exec(count_statement).one()
-    groups = session.exec(statement).all()
+    count = (await session.exec(count_statement)).one()
+    groups = (await session.exec(statement)).all()
     
     return GroupsPublic(groups=groups, count=count)
 
 
 @router.get("/{id}", response_model=GroupPublic)
-def read_group(session: SessionDep, currentUser: CurrentUserOptional, id:int) -> Any:
+async def read_group(
+    session: AsyncSessionDep, currentUser: CurrentUserOptional, id: int
+) -> Any:
     """
     Get group by ID.
     """
-    group = session.get(Group, id)
+    group = await session.get(Group, id)
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
     return group
@@ -49,6 +57,7 @@ def create_group(
     group = Group.model_validate(group_in)
     session.add(group)
     session.commit()
+    response_cache.invalidate("groups", "posts")
     session.refresh(group)
     return group
 
@@ -73,6 +82,7 @@ def update_group(
         
     session.add(group)
     session.commit()
+    response_cache.invalidate("groups", "posts")
     session.refresh(group)
     return group
 
@@ -89,5 +99,6 @@ def delete_group(
         raise HTTPException(status_code=404, detail="Group not found")
     session.delete(group)
     session.commit()
+    response_cache.invalidate("groups", "posts")
     logging.info(f"Group {id} deleted by {current_user.email}")
     return Message(message="Group deleted successfully")
@@ -3,45 +3,100 @@ import logging
 from typing import Any
 from datetime import datetime
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select, column
-
-from app.api.deps import CurrentUser, CurrentUserOptional, SessionDep
+from fastapi import APIRouter, HTTPException, Request
+from sqlmodel import col, select, column
+
+from app.api.conditional import (
+    is_conditional,
+    loaded_page_validators,
+    page_validators,
+    row_validators,
+    version_validators,
+)
+from app.api.deps import (
+    AsyncSessionDep,
+    CurrentUser,
+    CurrentUserOptional,
+    SessionDep,
+)
+from app.api.pagination import Keyset, PageDep, paginate
+from app.api.responses import lecture_public, lectures_public
+from app.core.cache import response_cache
 from app.models import Group, LectureCreate, LectureUpdate, Lectures, LecturesCreate, Post, Lecture, LecturePublic, LecturesPublic, Message
 
 router = APIRouter() 
 
+version_columns = (col(Lecture.id), col(Lecture.last_updated))
+
+
+def version(lecture: Lecture) -> tuple[Any, ...]:
+    return (lecture.id, lecture.last_updated)
+
+keyset = Keyset(col(Lecture.start), col(Lecture.id))
+
 
 @router.get("/", response_model=LecturesPublic)
-def read_lectures(
-    session: SessionDep, currentUser: CurrentUserOptional, skip: int = 0, limit: int = 100
+async def read_lectures(
+    session: AsyncSessionDep,
+    currentUser: CurrentUserOptional,
+    page: PageDep,
+    request: Request,
 ) -> Any:
     """
     Retrieve lectures.
     """
 
-    count_statement = select(func.count()).select_from(Lecture)
     statement = select(Lecture)
     if currentUser == None:
-        count_statement = count_statement.where(Lecture.is_visible == True)
         statement = statement.where(Lecture.is_visible == True)
 
-    statement = statement.offset(skip).limit(limit)
-    count = session.exec(count_statement).one()
-    lectures = session.exec(statement).all()
-    
-    return LecturesPublic(lectures=lectures, count=count)
+    if is_conditional(request, last_modified=False):
+        validators = await session.run_sync(
+            page_validators, statement, page, keyset, version_columns
+        )
+        if validators.matches(request):
+            return validators.not_modified()
+
+    result = await session.run_sync(paginate, statement, page, keyset)
+
+    return lectures_public.response(
+        LecturesPublic(
+            lectures=result.rows,
+            count=result.count,
+            has_more=result.has_more,
+            next_cursor=result.next_cursor,
+        ),
+        headers=loaded_page_validators(result, page, version).headers,
+    )
 
 
 @router.get("/{id}", response_model=LecturePublic)
-def read_lecture(session: SessionDep, currentUser: CurrentUserOptional, id:int) -> Any:
+async def read_lecture(
+    session: AsyncSessionDep,
+    currentUser: CurrentUserOptional,
+    id: int,
+    request: Request,
+) -> Any:
     """
     Get lecture by ID.
     """
-    lecture = session.get(Lecture, id)
-    if not lecture or (currentUser == None and not lecture.is_visible):
+    if is_conditional(request):
+        statement = select(*version_columns).where(Lecture.id == id)
+        if currentUser is None:
+            statement = statement.where(Lecture.is_visible == True)
+        validators = await session.run_sync(row_validators, statement)
+        if validators is None:
+            raise HTTPException(status_code=404, detail="Lecture not found")
+        if validators.matches(request):
+            return validators.not_modified()
+
+    lecture = await session.get(Lecture, id)
+    if not lecture or (currentUser is None and not lecture.is_visible):
         raise HTTPException(status_code=404, detail="Lecture not found")
-    return lecture
+    return lecture_public.response(
+        lecture_public.validate(lecture),
+        headers=version_validators(version(lecture)).headers,
+    )
 
 
 @router.post("/multiple/", response_model=Lectures)
@@ -72,6 +127,7 @@ def create_lectures(
         })
         session.add(lecture_in)
     session.commit()
+    response_cache.invalidate("lectures", "posts")
     session.refresh(post)
     statement = select(Lecture).where(Lecture.post_id == post.id)
     lectures = session.exec(statement).all()
@@ -97,6 +153,7 @@ def create_lecture(
     
     session.add(lecture)
     session.commit()
+    response_cache.invalidate("lectures", "posts")
     session.refresh(lecture)
     
     return lecture
@@ -120,6 +177,7 @@ def update_lecture(
     lecture.sqlmodel_update(update_dict, update={"updated_by": current_user.id, "last_updated": datetime.now()})
     session.add(lecture)
     session.commit()
+    response_cache.invalidate("lectures", "posts")
     session.refresh(lecture)
     return lecture
 
@@ -136,5 +194,6 @@ def delete_lecture(
         raise HTTPException(status_code=404, detail="Lecture not found")
     session.delete(lecture)
     session.commit()
+    response_cache.invalidate("lectures", "posts")
     logging.info(f"Lecture {id} deleted by {current_user.email}")
     return Message(message="Lecture deleted successfully")
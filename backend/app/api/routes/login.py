@@ -1,46 +1,115 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
 from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import HTMLResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from jwt.exceptions import InvalidTokenError
+from pydantic import ValidationError
 
 from app import crud
-from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
+from app.api.deps import (
+    AsyncSessionDep,
+    CurrentUser,
+    SessionDep,
+    TokenDep,
+    decode_token,
+    get_current_active_superuser,
+    get_user,
+)
 from app.core import security
 from app.core.config import settings
-from app.core.security import get_password_hash
-from app.models import Message, NewPassword, Token, UserPublic
+from app.core.outbox import queue_email
+from app.core.security import get_password_hash_async
+from app.models import (
+    Message,
+    NewPassword,
+    RefreshTokenRequest,
+    Token,
+    User,
+    UserPublic,
+)
 from app.utils import (
     generate_password_reset_token,
     generate_reset_password_email,
-    send_email,
     verify_password_reset_token,
 )
 
 router = APIRouter()
 
 
+def create_tokens(user: User, refresh_token: str) -> Token:
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    return Token(
+        access_token=security.create_access_token(
+            user.id, expires_delta=access_token_expires
+        ),
+        refresh_token=refresh_token,
+    )
+
+
 @router.post("/login/access-token")
-def login_access_token(
-    session: SessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
+async def login_access_token(
+    session: AsyncSessionDep,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 ) -> Token:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = crud.authenticate(
+    user = await crud.authenticate_async(
         session=session, email=form_data.username, password=form_data.password
     )
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    return Token(
-        access_token=security.create_access_token(
-            user.id, expires_delta=access_token_expires
+    user_id = user.id
+    refresh_token = await session.run_sync(
+        lambda sync_session: crud.create_refresh_token(
+            session=sync_session, user_id=user_id
         )
     )
+    return create_tokens(user, refresh_token)
+
+
+@router.post("/login/refresh-token")
+def login_refresh_token(session: SessionDep, body: RefreshTokenRequest) -> Token:
+    """
+    Exchange a refresh token for a new access token and a new refresh token,
+    the old refresh token cannot be used again
+    """
+    rotated = crud.rotate_refresh_token(session=session, token=body.refresh_token)
+    if rotated is None:
+        raise HTTPException(status_code=400, detail="Invalid refresh token")
+    user_id, refresh_token = rotated
+    user = get_user(session, str(user_id))
+    if not user or not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return create_tokens(user, refresh_token)
+
+
+@router.post("/logout")
+def logout(session: SessionDep, token: TokenDep, body: RefreshTokenRequest) -> Message:
+    """
+    Revoke a refresh token and every token rotated from the same login, and
+    the access token the request is authenticated with
+    """
+    if token is not None:
+        try:
+            token_data = decode_token(token)
+        except (InvalidTokenError, ValidationError):
+            token_data = None
+        if token_data and token_data.jti and token_data.exp:
+            crud.revoke_access_token(
+                session=session,
+                jti=token_data.jti,
+                expires_at=datetime.fromtimestamp(token_data.exp),
+            )
+    db_token = crud.get_refresh_token(session=session, token=body.refresh_token)
+    if db_token is not None:
+        crud.revoke_refresh_tokens(session=session, family_id=db_token.family_id)
+        session.commit()
+    return Message(message="Logged out")
 
 
 @router.post("/login/test-token", response_model=UserPublic)
@@ -67,7 +136,8 @@ def recover_password(email: str, session: SessionDep) -> Message:
     email_data = generate_reset_password_email(
         email_to=user.email, email=email, token=password_reset_token
     )
-    send_email(
+    queue_email(
+        session=session,
         email_to=user.email,
         subject=email_data.subject,
         html_content=email_data.html_content,
@@ -76,14 +146,14 @@ def recover_password(email: str, session: SessionDep) -> Message:
 
 
 @router.post("/reset-password/")
-def reset_password(session: SessionDep, body: NewPassword) -> Message:
+async def reset_password(session: AsyncSessionDep, body: NewPassword) -> Message:
     """
     Reset password
     """
     email = verify_password_reset_token(token=body.token)
     if not email:
         raise HTTPException(status_code=400, detail="Invalid token")
-    user = crud.get_user_by_email(session=session, email=email)
+    user = await crud.get_user_by_email_async(session=session, email=email)
     if not user:
         raise HTTPException(
             status_code=404,
@@ -91,10 +161,16 @@ def reset_password(session: SessionDep, body: NewPassword) -> Message:
         )
     elif not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    hashed_password = get_password_hash(password=body.new_password)
+    hashed_password = await get_password_hash_async(password=body.new_password)
     user.hashed_password = hashed_password
     session.add(user)
-    session.commit()
+    user_id = user.id
+    await session.run_sync(
+        lambda sync_session: crud.revoke_refresh_tokens(
+            session=sync_session, user_id=user_id
+        )
+    )
+    await session.commit()
     return Message(message="Password updated successfully")
 
 
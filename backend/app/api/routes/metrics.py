@@ -0,0 +1,28 @@
+import secrets
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.metrics import render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics(request: Request) -> str:
+    """
+    Request latencies, pools, caches, hashing and token revocation of this
+    worker in the Prometheus text format.
+    """
+    if not settings.METRICS_TOKEN:
+        # Mounted on the public host, never open outside local development
+        if settings.ENVIRONMENT != "local":
+            raise HTTPException(status_code=404, detail="Not Found")
+    else:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not secrets.compare_digest(
+            token, settings.METRICS_TOKEN
+        ):
+            raise HTTPException(status_code=403, detail="Not authorized")
+    return render_metrics()
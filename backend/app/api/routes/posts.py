@@ -2,49 +2,162 @@ import logging
 from typing import Any
 from datetime import datetime
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select, update
+from fastapi import APIRouter, HTTPException, Request
+from sqlmodel import col, func, select, update
 
-from app.api.deps import CurrentUser, CurrentUserOptional, SessionDep
-from app.models import Lecture, Post, PostCreate, PostUpdate, PostPublic, PostsPublic, Message
+from app.api.conditional import (
+    is_conditional,
+    loaded_page_validators,
+    page_validators,
+    row_validators,
+    version_validators,
+)
+from app.api.deps import (
+    AsyncSessionDep,
+    CurrentUser,
+    CurrentUserOptional,
+    SessionDep,
+)
+from app.api.loaders import View, loader_options
+from app.api.pagination import Keyset, PageDep, paginate
+from app.api.responses import post_public, posts_public, posts_summary
+from app.core.cache import response_cache
+from app.models import Group, Lecture, Post, PostCreate, PostUpdate, PostPublic, PostsPublic, PostsSummary, Message
 
 
 router = APIRouter()
 
+keyset = Keyset(col(Post.created_at), col(Post.id), descending=True)
 
-@router.get("/", response_model=PostsPublic)
-def read_posts(
-    session: SessionDep, currentUser: CurrentUserOptional, group: int = 2, skip: int = 0, limit: int = 100
+# A post is rendered with its group and its lectures, so those are part of its version
+version_columns = (
+    col(Post.id),
+    col(Post.last_updated),
+    select(Group.name).where(Group.id == Post.group_id).scalar_subquery(),
+    select(func.count(col(Lecture.id)))
+    .where(Lecture.post_id == Post.id)
+    .scalar_subquery(),
+    select(func.max(Lecture.last_updated))
+    .where(Lecture.post_id == Post.id)
+    .scalar_subquery(),
+)
+# A summary only shows columns of the post itself
+summary_version_columns = (col(Post.id), col(Post.last_updated))
+
+
+def version(post: Post) -> tuple[Any, ...]:
+    """
+    Values of `version_columns` for a post loaded with its group and lectures.
+    """
+    return (
+        post.id,
+        post.last_updated,
+        post.group.name if post.group else None,
+        len(post.lectures),
+        max((lecture.last_updated for lecture in post.lectures), default=None),
+    )
+
+
+def summary_version(post: Post) -> tuple[Any, ...]:
+    return (post.id, post.last_updated)
+
+
+@router.get("/", response_model=PostsPublic | PostsSummary)
+async def read_posts(
+    session: AsyncSessionDep,
+    currentUser: CurrentUserOptional,
+    page: PageDep,
+    request: Request,
+    group: int = 2,
+    view: View = "full",
 ) -> Any:
     """
     Retrieve posts.
+
+    `view=summary` returns only the fields of the post cards, without their
+    text or lectures.
     """
     print(group, type(group))
-    count_statement = select(func.count()).select_from(Post).where(Post.group_id == group)
     statement = select(Post).where(Post.group_id == group)
         
     if currentUser == None:
         # If public
-        count_statement = count_statement.where(Post.is_visible == True)
         statement = statement.where(Post.is_visible == True)
-        
-    statement = statement.offset(skip).limit(limit)
-    count = session.exec(count_statement).one()
-    posts = session.exec(statement).all()
-    
 
-    return PostsPublic(posts=posts, count=count)
+    if is_conditional(request, last_modified=False):
+        validators = await session.run_sync(
+            page_validators,
+            statement,
+            page,
+            keyset,
+            summary_version_columns if view == "summary" else version_columns,
+        )
+        if validators.matches(request):
+            return validators.not_modified()
+
+    if view == "summary":
+        summaries = await session.run_sync(
+            paginate, statement.options(*loader_options(PostsSummary)), page, keyset
+        )
+        return posts_summary.response(
+            PostsSummary(
+                posts=summaries.rows,
+                count=summaries.count,
+                has_more=summaries.has_more,
+                next_cursor=summaries.next_cursor,
+            ),
+            headers=loaded_page_validators(summaries, page, summary_version).headers,
+        )
+
+    result = await session.run_sync(
+        paginate, statement.options(*loader_options(PostsPublic)), page, keyset
+    )
+
+    return posts_public.response(
+        PostsPublic(
+            posts=result.rows,
+            count=result.count,
+            has_more=result.has_more,
+            next_cursor=result.next_cursor,
+        ),
+        headers=loaded_page_validators(result, page, version).headers,
+    )
 
 
 @router.get("/{id}", response_model=PostPublic)
-def read_post(session: SessionDep, currentUser: CurrentUserOptional, id:int) -> Any:
+async def read_post(
+    session: AsyncSessionDep,
+    currentUser: CurrentUserOptional,
+    id: int,
+    request: Request,
+) -> Any:
     """
     Get post by ID.
     """
-    post = session.get(Post, id)
-    if not post or (currentUser == None and not post.is_visible):
+    # Only an ETag, deleting a lecture does not move any `last_updated` forward
+    if is_conditional(request, last_modified=False):
+        statement = (
+            select(Post)
+            .with_only_columns(*version_columns)
+            .where(col(Post.id) == id)
+        )
+        if currentUser is None:
+            statement = statement.where(col(Post.is_visible) == True)
+        validators = await session.run_sync(
+            row_validators, statement, last_modified=False
+        )
+        if validators is None:
+            raise HTTPException(status_code=404, detail="Post not found")
+        if validators.matches(request):
+            return validators.not_modified()
+
+    post = await session.get(Post, id, options=loader_options(PostPublic))
+    if not post or (currentUser is None and not post.is_visible):
         raise HTTPException(status_code=404, detail="Post not found")
-    return post
+    return post_public.response(
+        post_public.validate(post),
+        headers=version_validators(version(post), last_modified=False).headers,
+    )
 
 
 @router.post("/", response_model=Post)
@@ -62,6 +175,7 @@ def create_post(
     })
     session.add(post)
     session.commit()
+    response_cache.invalidate("posts", "lectures")
     session.refresh(post)
     return post
 
@@ -95,6 +209,7 @@ def update_post(
         
     session.add(post)
     session.commit()
+    response_cache.invalidate("posts", "lectures")
     session.refresh(post)
     return post
 
@@ -111,5 +226,6 @@ def delete_post(
         raise HTTPException(status_code=404, detail="Post not found")
     session.delete(post)
     session.commit()
+    response_cache.invalidate("posts", "lectures")
     logging.info(f"Post {id} deleted by {current_user.email}")
     return Message(message="Post deleted successfully")
@@ -2,17 +2,22 @@ import uuid
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import col, delete, func, select
+from sqlmodel import col, delete, select
 
 from app import crud
 from app.api.deps import (
+    AsyncSessionDep,
     CurrentUser,
+    CurrentUserAsync,
     CurrentUserOptional,
     SessionDep,
     get_current_active_superuser,
 )
+from app.api.pagination import Keyset, PageDep, paginate
+from app.core.cache import user_cache
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password
+from app.core.outbox import queue_email
+from app.core.security import get_password_hash_async, verify_password_async
 from app.models import (
     Message,
     UpdatePassword,
@@ -23,32 +28,35 @@ from app.models import (
     UserUpdate,
     UserUpdateMe,
 )
-from app.utils import generate_new_account_email, send_email
+from app.utils import generate_new_account_email
 
 router = APIRouter()
 
+keyset = Keyset(col(User.full_name), col(User.id))
+
 
 @router.get(
     "/",
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, currentUser: CurrentUserOptional, skip: int = 0, limit: int = 100) -> Any:
+def read_users(session: SessionDep, currentUser: CurrentUserOptional, page: PageDep) -> Any:
     """
     Retrieve users.
     """
 
-    count_statement = select(func.count()).select_from(User)
     statement = select(User)
     
     if currentUser == None:
-        count_statement = count_statement.where(User.is_public == True)
         statement = statement.where(User.is_public == True)
     
-    statement = statement.offset(skip).limit(limit)
-    count = session.exec(count_statement).one()
-    users = session.exec(statement).all()
+    result = paginate(session, statement, page, keyset)
 
-    return UsersPublic(data=users, count=count)
+    return UsersPublic(
+        data=result.rows,
+        count=result.count,
+        has_more=result.has_more,
+        next_cursor=result.next_cursor,
+    )
 
 
 @router.post(
@@ -70,7 +78,8 @@ def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
         email_data = generate_new_account_email(
             email_to=user_in.email, username=user_in.email, password=user_in.password
         )
-        send_email(
+        queue_email(
+            session=session,
             email_to=user_in.email,
             subject=email_data.subject,
             html_content=email_data.html_content,
@@ -96,27 +105,37 @@ def update_user_me(
     current_user.sqlmodel_update(user_data)
     session.add(current_user)
     session.commit()
+    user_cache.pop(str(current_user.id))
     session.refresh(current_user)
     return current_user
 
 
 @router.patch("/me/password", response_model=Message)
-def update_password_me(
-    *, session: SessionDep, body: UpdatePassword, current_user: CurrentUser
+async def update_password_me(
+    *, session: AsyncSessionDep, body: UpdatePassword, current_user: CurrentUserAsync
 ) -> Any:
     """
     Update own password.
     """
-    if not verify_password(body.current_password, current_user.hashed_password):
+    if not await verify_password_async(
+        body.current_password, current_user.hashed_password
+    ):
         raise HTTPException(status_code=400, detail="Incorrect password")
     if body.current_password == body.new_password:
         raise HTTPException(
             status_code=400, detail="New password cannot be the same as the current one"
         )
-    hashed_password = get_password_hash(body.new_password)
+    hashed_password = await get_password_hash_async(body.new_password)
     current_user.hashed_password = hashed_password
     session.add(current_user)
-    session.commit()
+    user_id = current_user.id
+    await session.run_sync(
+        lambda sync_session: crud.revoke_refresh_tokens(
+            session=sync_session, user_id=user_id
+        )
+    )
+    await session.commit()
+    user_cache.pop(str(user_id))
     return Message(message="Password updated successfully")
 
 
@@ -140,6 +159,7 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
 
     session.delete(current_user)
     session.commit()
+    user_cache.pop(str(current_user.id))
     return Message(message="User deleted successfully")
 
 
@@ -225,4 +245,5 @@ def delete_user(
         )
     session.delete(user)
     session.commit()
+    user_cache.pop(str(user.id))
     return Message(message="User deleted successfully")
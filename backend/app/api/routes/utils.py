@@ -1,9 +1,15 @@
 from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
 
-from app.api.deps import get_current_active_superuser
-from app.models import Message
-from app.utils import generate_test_email, send_email
+from app.api.deps import SessionDep, get_current_active_superuser
+from app.core.cache import caches
+from app.core.db import async_engine, engine
+from app.core.outbox import queue_email
+from app.core.pool import collect_pool_stats
+from app.core.revocation import revocation_list
+from app.core.security import hashing_pool
+from app.models import CacheStats, HashingStats, Message, PoolStats, RevocationStats
+from app.utils import generate_test_email
 
 router = APIRouter()
 
@@ -13,14 +19,63 @@ router = APIRouter()
     dependencies=[Depends(get_current_active_superuser)],
     status_code=201,
 )
-def test_email(email_to: EmailStr) -> Message:
+def test_email(session: SessionDep, email_to: EmailStr) -> Message:
     """
     Test emails.
     """
     email_data = generate_test_email(email_to=email_to)
-    send_email(
+    queue_email(
+        session=session,
         email_to=email_to,
         subject=email_data.subject,
         html_content=email_data.html_content,
     )
     return Message(message="Test email sent")
+
+
+@router.get(
+    "/cache-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def cache_stats() -> list[CacheStats]:
+    """
+    Hit and miss counters of the in-process caches of this worker.
+    """
+    return [CacheStats.model_validate(cache.stats()) for cache in caches]
+
+
+@router.get(
+    "/pool-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def pool_stats() -> list[PoolStats]:
+    """
+    Occupancy and checkout waits of the connection pools of this worker.
+    """
+    return [
+        PoolStats.model_validate(collect_pool_stats("sync", engine)),
+        PoolStats.model_validate(collect_pool_stats("async", async_engine.sync_engine)),
+    ]
+
+
+@router.get(
+    "/hashing-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def hashing_stats() -> HashingStats:
+    """
+    Queue depth and latency of the password hashing threads of this worker.
+    """
+    return HashingStats.model_validate(hashing_pool.stats())
+
+
+@router.get(
+    "/revocation-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def revocation_stats() -> RevocationStats:
+    """
+    Size of the revoked token filter of this worker and how many lookups it
+    let through to the database.
+    """
+    return RevocationStats.model_validate(revocation_list.stats())
@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable, Collection, Hashable
+from dataclasses import dataclass, field
+from typing import Any, Generic, TypeVar
+
+from starlette.routing import BaseRoute
+
+from app.core.compression import compress, encoded_headers
+from app.core.config import settings
+from app.models import TokenPayload, User
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Thread-safe LRU cache whose entries expire `ttl` seconds after being set.
+    """
+
+    def __init__(self, name: str, *, maxsize: int, ttl: float) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires, value = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: K) -> V | None:
+        with self._lock:
+            item = self._data.pop(key, None)
+        return item[1] if item else None
+
+    def evict(self, predicate: Callable[[K], bool]) -> int:
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    # Route that rendered it, for the metrics of the requests it serves
+    route: BaseRoute | None = None
+    # Content coding -> headers and body compressed with it, filled on first use
+    encoded: dict[str, tuple[list[tuple[bytes, bytes]], bytes]] = field(
+        default_factory=dict
+    )
+
+    def encode(self, encoding: str) -> tuple[list[tuple[bytes, bytes]], bytes]:
+        # Racing requests may both compress it, either result is kept
+        variant = self.encoded.get(encoding)
+        if variant is None:
+            body = compress(self.body, encoding)
+            variant = (encoded_headers(self.headers, encoding, len(body)), body)
+            self.encoded[encoding] = variant
+        return variant
+
+
+# (namespace, path, normalized query string)
+ResponseKey = tuple[str, str, str]
+
+
+class ResponseCache:
+    """
+    Rendered responses of the public GET endpoints, grouped by the resource
+    namespace (`posts`, `events`, ...) they are read from.
+
+    Writes invalidate whole namespaces. Each invalidation also bumps the
+    namespace generation, so a response computed before the write but stored
+    after it is dropped instead of being served until it expires.
+
+    `publish`, when set, is called with the namespaces of every local
+    invalidation so the other workers can evict them too.
+    """
+
+    def __init__(self, name: str, *, maxsize: int, ttl: float) -> None:
+        self.entries: TTLCache[ResponseKey, CachedResponse] = TTLCache(
+            name, maxsize=maxsize, ttl=ttl
+        )
+        self.publish: Callable[[Collection[str]], None] | None = None
+        self._generations: defaultdict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def generation(self, namespace: str) -> int:
+        return self._generations[namespace]
+
+    def get(self, key: ResponseKey) -> CachedResponse | None:
+        return self.entries.get(key)
+
+    def set(self, key: ResponseKey, response: CachedResponse, generation: int) -> None:
+        with self._lock:
+            if self._generations[key[0]] != generation:
+                return
+            self.entries.set(key, response)
+
+    def invalidate(self, *namespaces: str) -> None:
+        self.evict(namespaces)
+        if self.publish is not None:
+            self.publish(namespaces)
+
+    def evict(self, namespaces: Collection[str]) -> None:
+        with self._lock:
+            for namespace in namespaces:
+                self._generations[namespace] += 1
+            self.entries.evict(lambda key: key[0] in namespaces)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+response_cache = ResponseCache(
+    "responses",
+    maxsize=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+)
+
+
+# Access token -> its claims and expiry, saves the signature check
+token_cache: TTLCache[str, tuple[TokenPayload, float]] = TTLCache(
+    "tokens",
+    maxsize=settings.USER_CACHE_MAX_ENTRIES,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+# User id -> detached copy of the row, to be merged into the request session
+user_cache: TTLCache[str, User] = TTLCache(
+    "users",
+    maxsize=settings.USER_CACHE_MAX_ENTRIES,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+
+# The caches of the process reported by the stats and metrics endpoints,
+# caches built elsewhere (e.g. by the tests) are not listed
+caches: list[TTLCache[Any, Any]] = [response_cache.entries, token_cache, user_cache]
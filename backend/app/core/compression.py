@@ -0,0 +1,89 @@
+import gzip
+
+import brotli  # type: ignore[import-untyped]
+
+from app.core.config import settings
+
+Headers = list[tuple[bytes, bytes]]
+
+# Content codings we produce, the first one wins when the client weighs
+# several of them equally
+ENCODINGS = ("br", "gzip")
+COMPRESSIBLE_TYPES = (b"application/json", b"text/")
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """
+    Pick the coding to send for an `Accept-Encoding` header, `None` for the
+    uncompressed body.
+    """
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        weight = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return bytes(
+            brotli.compress(
+                body, mode=brotli.MODE_TEXT, quality=settings.COMPRESSION_BROTLI_QUALITY
+            )
+        )
+    # No timestamp, the same body always compresses to the same bytes
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def compressible(headers: Headers, size: int) -> bool:
+    """
+    Whether a body of `size` bytes sent with `headers` is worth compressing.
+    """
+    if size < settings.COMPRESSION_MIN_SIZE:
+        return False
+    content_type = b""
+    for name, value in headers:
+        if name == b"content-encoding":
+            return False
+        if name == b"content-type":
+            content_type = value
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def vary(headers: Headers) -> Headers:
+    """
+    Add `Accept-Encoding` to the `Vary` header of a compressible response,
+    whether or not this one is compressed.
+    """
+    values = [value for name, value in headers if name == b"vary"]
+    if any(b"accept-encoding" in value.lower() for value in values):
+        return headers
+    if not values:
+        return [*headers, (b"vary", b"Accept-Encoding")]
+    return [
+        (name, value + b", Accept-Encoding" if name == b"vary" else value)
+        for name, value in headers
+    ]
+
+
+def encoded_headers(headers: Headers, encoding: str, size: int) -> Headers:
+    """
+    Headers of the response compressed with `encoding` to `size` bytes.
+    """
+    return [
+        *((name, value) for name, value in vary(headers) if name != b"content-length"),
+        (b"content-encoding", encoding.encode()),
+        (b"content-length", str(size).encode()),
+    ]
@@ -29,8 +29,12 @@ class Settings(BaseSettings):
     )
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str = secrets.token_urlsafe(32)
+    # The frontend does not renew its access token with the refresh token yet,
+    # shorten this (e.g. to 15 minutes) once it does
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # 60 minutes * 24 hours * 8 days = 8 days
+    REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
     DOMAIN: str = "localhost"
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
 
@@ -48,6 +52,8 @@ class Settings(BaseSettings):
 
     PROJECT_NAME: str
     SENTRY_DSN: HttpUrl | None = None
+    # Share of the requests traced by Sentry
+    SENTRY_TRACES_SAMPLE_RATE: float = 0.05
     POSTGRES_SERVER: str
     POSTGRES_PORT: int = 5432
     POSTGRES_USER: str
@@ -66,6 +72,69 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Pools of every worker process: the sync engine (write routes, outbox
+    # dispatcher) and the async engine (public reads). A worker opens at most
+    # POOL_SIZE + MAX_OVERFLOW + ASYNC_POOL_SIZE + ASYNC_MAX_OVERFLOW + 1 (the
+    # LISTEN connection) connections, 21 by default. Keep that times the
+    # number of workers below the max_connections of Postgres (100).
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_MAX_OVERFLOW: int = 5
+    POSTGRES_ASYNC_POOL_SIZE: int = 5
+    POSTGRES_ASYNC_MAX_OVERFLOW: int = 5
+    POSTGRES_POOL_TIMEOUT: float = 10
+    # Seconds before a connection is replaced, -1 keeps it forever
+    POSTGRES_POOL_RECYCLE: int = 1800
+    # Test connections on checkout so none is stale after a Postgres restart
+    POSTGRES_POOL_PRE_PING: bool = True
+    # Server-side limit of a single statement, 0 disables it
+    POSTGRES_STATEMENT_TIMEOUT_MS: int = 30_000
+    # Statements taking at least this long are logged, 0 disables the log
+    SLOW_QUERY_THRESHOLD_MS: int = 250
+    # Connect through PgBouncer in transaction pooling mode: no prepared
+    # statements and no session state. LISTEN needs a session, so the response
+    # caches of the workers then only agree once their entries expire.
+    POSTGRES_PGBOUNCER: bool = False
+
+    # Process-local cache of anonymous GET responses, 0 disables it
+    RESPONSE_CACHE_TTL_SECONDS: int = 60
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+
+    # Responses of at least this many bytes are compressed when the client
+    # accepts it, cached responses are compressed once per encoding
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+
+    # Bearer token the Prometheus scraper sends to read /metrics, when unset
+    # the endpoint is only served in local development
+    METRICS_TOKEN: str | None = None
+
+    # Decoded access tokens and the users they belong to, 0 disables it
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_ENTRIES: int = 1024
+
+    # Threads hashing and verifying passwords, and how many more calls may
+    # wait for them before logins are answered with 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 16
+
+    # Scheme of new password hashes. Hashes made with the other scheme or with
+    # weaker parameters are still accepted and replaced at the next login.
+    # The argon2id defaults are the OWASP minimum (19 MiB, 2 passes), see
+    # scripts/hash_benchmark.py for their cost on the production hardware.
+    PASSWORD_HASH_SCHEME: Literal["argon2", "bcrypt"] = "argon2"
+    ARGON2_MEMORY_COST_KIB: int = 19456
+    ARGON2_TIME_COST: int = 2
+    ARGON2_PARALLELISM: int = 1
+    BCRYPT_ROUNDS: int = 12
+
+    # Revoked access tokens are mirrored in a Bloom filter of every worker,
+    # sized for CAPACITY live revocations, and refreshed from the database
+    # every REFRESH_SECONDS
+    TOKEN_REVOCATION_CAPACITY: int = 100_000
+    TOKEN_REVOCATION_ERROR_RATE: float = 0.01
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = 5
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -84,6 +153,26 @@ class Settings(BaseSettings):
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
 
+    # Emails are queued in the outbox table and sent by a dispatcher thread
+    # of every worker, BATCH_SIZE at a time over one SMTP connection. Failed
+    # sends are retried after RETRY_BASE_SECONDS, doubled on every attempt
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS: float = 30
+    EMAIL_OUTBOX_RETRY_MAX_SECONDS: float = 60 * 60
+
+    # Contact requests accepted per client IP and per sender email, BURST at
+    # once then PER_HOUR, and for how long an identical request is ignored
+    CONTACT_RATE_LIMIT_BURST: int = 3
+    CONTACT_RATE_LIMIT_PER_HOUR: float = 10
+    CONTACT_DUPLICATE_TTL_SECONDS: int = 60 * 60 * 24
+
+    # Reverse proxies (Traefik) in front of the backend, each appends the
+    # address it received the request from to X-Forwarded-For. The client IP
+    # is the address that many hops from the end, 0 ignores the header.
+    FORWARDED_PROXY_HOPS: int = 0
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def emails_enabled(self) -> bool:
@@ -1,10 +1,22 @@
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session, create_engine, select
 
 from app import crud
 from app.core.config import settings
+from app.core.pool import engine_options, set_local_statement_timeout
+from app.core.querystats import instrument
 from app.models import User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **engine_options())
+# The public read path runs on the event loop, migrations, scripts and the
+# write routes keep using the sync engine
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), **engine_options(is_async=True)
+)
+set_local_statement_timeout(engine)
+set_local_statement_timeout(async_engine.sync_engine)
+instrument(engine)
+instrument(async_engine.sync_engine)
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -0,0 +1,108 @@
+import asyncio
+import math
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class HashingBusy(Exception):
+    """
+    Raised instead of queueing a hash behind `max_queue` others.
+    """
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Too many password hashes in progress")
+        self.retry_after = retry_after
+
+
+class HashingPool:
+    """
+    Dedicated threads for password hashing and verification.
+
+    bcrypt releases the GIL, so `workers` threads hash in parallel while the
+    callers only wait for the result, async routes without holding a thread
+    (`run_async`). At most `workers + max_queue` calls are accepted at once,
+    any other one fails right away with `HashingBusy` instead of piling up
+    behind a login burst.
+    """
+
+    def __init__(self, *, workers: int, max_queue: int) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.hash_seconds_total = 0.0
+        self.hash_seconds_max = 0.0
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="hashing")
+        self._lock = threading.Lock()
+
+    def _submit(self, fn: Callable[..., T], *args: Any) -> Future[T]:
+        with self._lock:
+            if self.in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HashingBusy(self._retry_after())
+            self.in_flight += 1
+        submitted = time.perf_counter()
+
+        def task() -> T:
+            started = time.perf_counter()
+            with self._lock:
+                self.running += 1
+                self.wait_seconds_total += started - submitted
+            try:
+                return fn(*args)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self.running -= 1
+                    self.in_flight -= 1
+                    self.completed += 1
+                    self.hash_seconds_total += elapsed
+                    self.hash_seconds_max = max(self.hash_seconds_max, elapsed)
+
+        future = self._executor.submit(task)
+        future.add_done_callback(self._release_cancelled)
+        return future
+
+    def _release_cancelled(self, future: Future[Any]) -> None:
+        # Cancelled before a worker picked it up, `task` never ran
+        if future.cancelled():
+            with self._lock:
+                self.in_flight -= 1
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        return self._submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.wrap_future(self._submit(fn, *args))
+
+    def _retry_after(self) -> int:
+        # Time for the workers to drain the current queue
+        average = self.hash_seconds_total / self.completed if self.completed else 0
+        return max(1, math.ceil(average * self.in_flight / self.workers))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            completed = self.completed
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self.in_flight - self.running,
+                "running": self.running,
+                "completed": completed,
+                "rejected": self.rejected,
+                "wait_seconds_avg": (
+                    self.wait_seconds_total / completed if completed else 0
+                ),
+                "hash_seconds_avg": (
+                    self.hash_seconds_total / completed if completed else 0
+                ),
+                "hash_seconds_max": self.hash_seconds_max,
+            }
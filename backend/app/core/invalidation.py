@@ -0,0 +1,78 @@
+import logging
+import threading
+import uuid
+from collections.abc import Collection
+
+import psycopg
+from sqlalchemy import Engine
+from sqlmodel import func, select
+
+from app.core.cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+
+# Tells the notifications of this worker apart from the ones of its peers
+worker_id = uuid.uuid4().hex
+
+
+def publish(engine: Engine, namespaces: Collection[str]) -> None:
+    """
+    Tell every worker listening on the database to evict `namespaces`.
+    """
+    payload = f"{worker_id}:{','.join(namespaces)}"
+    with engine.begin() as connection:
+        connection.execute(select(func.pg_notify(CHANNEL, payload)))
+
+
+class InvalidationListener:
+    """
+    Evict the namespaces published by the other workers from `cache`.
+
+    Runs `LISTEN` on a dedicated connection in a daemon thread. Whenever the
+    connection is lost the whole cache is cleared, as notifications sent in
+    the meantime are gone.
+    """
+
+    def __init__(
+        self, engine: Engine, cache: ResponseCache, *, poll_interval: float = 1.0
+    ) -> None:
+        self.conninfo = engine.url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id
+        self.ready = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="cache-invalidation", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._listen()
+            except psycopg.Error as e:
+                logger.warning(f"Cache invalidation listener disconnected: {e}")
+                self.ready.clear()
+                self.cache.clear()
+                self._stopped.wait(self.poll_interval)
+
+    def _listen(self) -> None:
+        with psycopg.connect(self.conninfo, autocommit=True) as connection:
+            connection.execute(f"LISTEN {CHANNEL}")
+            self.ready.set()
+            while not self._stopped.is_set():
+                for notify in connection.notifies(timeout=self.poll_interval):
+                    sender, _, namespaces = notify.payload.partition(":")
+                    if sender != self.worker_id:
+                        self.cache.evict(namespaces.split(","))
@@ -0,0 +1,219 @@
+import bisect
+import threading
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any
+
+from app.core.cache import caches
+from app.core.db import async_engine, engine
+from app.core.pool import collect_pool_stats
+from app.core.revocation import revocation_list
+from app.core.security import hashing_pool
+
+# Upper bounds in seconds, the defaults of the Prometheus client libraries
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"'
+        for name, value in zip(names, values, strict=True)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """
+    Prometheus histogram, one series per combination of label values.
+
+    Observations only bump a bucket counter, the cumulative counts of the
+    text format are computed when rendering.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str],
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # Label values -> (count per bucket, the last one is +Inf; sum)
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, values: tuple[str, ...], amount: float) -> None:
+        index = bisect.bisect_left(self.buckets, amount)
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                series = self._series[values] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += amount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = [
+                (values, list(counts), total[0])
+                for values, (counts, total) in self._series.items()
+            ]
+        for values, counts, total in sorted(series):
+            cumulative = 0
+            for bound, count in zip([*self.buckets, "+Inf"], counts, strict=True):
+                cumulative += count
+                labels = _labels((*self.labels, "le"), (*values, bound))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _labels(self.labels, values)
+            yield f"{self.name}_sum{labels} {total}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Gauge:
+    """
+    Single value without labels that goes up and down.
+    """
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: int = 1) -> None:
+        self.inc(-amount)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {self.value}"
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the end of its response.",
+    ("route", "status"),
+)
+db_statements = Histogram(
+    "http_request_db_statements",
+    "Statements sent to the database by a request.",
+    ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+db_duration = Histogram(
+    "http_request_db_duration_seconds",
+    "Time a request spent waiting on database statements.",
+    ("route",),
+)
+requests_in_flight = Gauge(
+    "http_requests_in_flight", "Requests being handled by this worker."
+)
+
+
+def _family(
+    name: str,
+    kind: str,
+    help: str,
+    label: str,
+    samples: Iterable[tuple[str, Any]],
+) -> Iterator[str]:
+    yield f"# HELP {name} {help}"
+    yield f"# TYPE {name} {kind}"
+    for value, sample in samples:
+        yield f"{name}{_labels((label,), (value,))} {sample}"
+
+
+def _stats_families(
+    prefix: str, stats: list[dict[str, Any]], fields: dict[str, tuple[str, str]]
+) -> Iterator[str]:
+    """
+    One family per field of the `stats()` dicts, labeled by their name.
+    `fields` maps a field to its metric kind and help, counters get the
+    `_total` suffix.
+    """
+    for field, (kind, help) in fields.items():
+        name = f"{prefix}_{field}" + ("_total" if kind == "counter" else "")
+        yield from _family(
+            name, kind, help, "name", ((item["name"], item[field]) for item in stats)
+        )
+
+
+def render_metrics() -> str:
+    """
+    Metrics of this worker in the Prometheus text exposition format.
+    """
+    pools = [
+        collect_pool_stats("sync", engine),
+        collect_pool_stats("async", async_engine.sync_engine),
+    ]
+    hashing = {"name": "passwords", **hashing_pool.stats()}
+    revocation = {"name": "access_tokens", **revocation_list.stats()}
+    lines = [
+        *request_duration.render(),
+        *db_statements.render(),
+        *db_duration.render(),
+        *requests_in_flight.render(),
+        *_stats_families(
+            "db_pool",
+            pools,
+            {
+                "size": ("gauge", "Connections kept open by the pool."),
+                "checked_out": ("gauge", "Connections in use."),
+                "overflow": ("gauge", "Connections open beyond the pool size."),
+                "checkouts": ("counter", "Connections handed out."),
+                "timeouts": ("counter", "Checkouts that timed out."),
+                "wait_seconds_max": ("gauge", "Longest wait for a connection."),
+            },
+        ),
+        *_stats_families(
+            "cache",
+            [cache.stats() for cache in caches],
+            {
+                "size": ("gauge", "Entries in the cache."),
+                "maxsize": ("gauge", "Entries the cache holds at most."),
+                "hits": ("counter", "Lookups answered by the cache."),
+                "misses": ("counter", "Lookups missing or expired."),
+                "evictions": ("counter", "Entries dropped to make room."),
+            },
+        ),
+        *_stats_families(
+            "hashing",
+            [hashing],
+            {
+                "queued": ("gauge", "Hashes waiting for a thread."),
+                "running": ("gauge", "Hashes being computed."),
+                "completed": ("counter", "Hashes computed."),
+                "rejected": ("counter", "Hashes refused with a full queue."),
+                "hash_seconds_max": ("gauge", "Longest hash computation."),
+            },
+        ),
+        *_stats_families(
+            "revocation",
+            [revocation],
+            {
+                "entries": ("gauge", "Revoked tokens in the filter."),
+                "lookups": ("counter", "Tokens checked against the filter."),
+                "db_checks": ("counter", "Filter hits checked in the database."),
+                "false_positives": ("counter", "Filter hits that were not revoked."),
+            },
+        ),
+    ]
+    return "\n".join(lines) + "\n"
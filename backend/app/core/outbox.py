@@ -0,0 +1,154 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from emails.backend.smtp import SMTPBackend  # type: ignore
+from sqlalchemy import Engine
+from sqlmodel import Session, col, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models import EmailOutbox
+from app.utils import send_email, smtp_options
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(
+    *, session: Session, email_to: str, subject: str, html_content: str
+) -> EmailOutbox:
+    """
+    Store an email in the outbox, it is sent by the dispatcher shortly after.
+    """
+    assert settings.emails_enabled, "no provided configuration for email variables"
+    email = EmailOutbox(email_to=email_to, subject=subject, html_content=html_content)
+    session.add(email)
+    session.commit()
+    email_dispatcher.wake()
+    return email
+
+
+def retry_delay(attempts: int) -> timedelta:
+    seconds = settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.EMAIL_OUTBOX_RETRY_MAX_SECONDS))
+
+
+class EmailDispatcher:
+    """
+    Send the emails of the outbox in a daemon thread.
+
+    Due emails are claimed with `FOR UPDATE SKIP LOCKED`, so the dispatchers
+    of all the workers share the outbox without sending an email twice. A
+    batch is sent over a single SMTP connection and stays locked until its
+    results are committed.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        *,
+        batch_size: int,
+        poll_interval: float,
+        max_attempts: int,
+    ) -> None:
+        self.engine = engine
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="email-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                claimed = self.dispatch()
+            except Exception:
+                logger.exception("Email dispatch failed")
+                claimed = 0
+            # A full batch means more emails are probably due
+            if claimed < self.batch_size:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def dispatch(self) -> int:
+        """
+        Send one batch of due emails, returns how many were claimed.
+        """
+        with Session(self.engine) as session:
+            statement = (
+                select(EmailOutbox)
+                .where(
+                    EmailOutbox.status == "pending",
+                    col(EmailOutbox.next_attempt_at) <= datetime.now(),
+                )
+                .order_by(col(EmailOutbox.next_attempt_at))
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            batch = session.exec(statement).all()
+            if not batch:
+                return 0
+            smtp = SMTPBackend(**smtp_options())
+            try:
+                for email in batch:
+                    self._send(smtp, email)
+                    session.add(email)
+            finally:
+                smtp.close()
+            session.commit()
+        return len(batch)
+
+    def _send(self, smtp: SMTPBackend, email: EmailOutbox) -> None:
+        email.attempts += 1
+        try:
+            response = send_email(
+                email_to=email.email_to,
+                subject=email.subject,
+                html_content=email.html_content,
+                smtp=smtp,
+            )
+            error = None if response.success else repr(response.error or response)
+        except Exception as e:
+            error = repr(e)
+        now = datetime.now()
+        if error is None:
+            email.status = "sent"
+            email.sent_at = now
+            email.html_content = ""
+            email.last_error = None
+            return
+        logger.warning(f"Sending email {email.id} failed: {error}")
+        email.last_error = error
+        if email.attempts >= self.max_attempts:
+            email.status = "failed"
+            # Never retried, do not keep the rendered email (reset links,
+            # passwords) once it has been given up
+            email.html_content = ""
+        else:
+            email.next_attempt_at = now + retry_delay(email.attempts)
+
+
+email_dispatcher = EmailDispatcher(
+    engine,
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    poll_interval=settings.EMAIL_OUTBOX_POLL_SECONDS,
+    max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+)
@@ -0,0 +1,120 @@
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import Engine, event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+from app.core.config import settings
+
+
+class PoolMetrics:
+    """
+    How long connections are waited for and how often the wait times out.
+    """
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool measuring the time spent waiting for a connection.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Each engine has its own, QueuePool only keeps it private
+        self.max_overflow: int = kwargs.get("max_overflow", 10)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.observe(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.observe(time.perf_counter() - start)
+        return connection
+
+
+class TimedAsyncQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(*, is_async: bool = False) -> dict[str, Any]:
+    """
+    Keyword arguments of `create_engine` / `create_async_engine` built from
+    the pool settings.
+    """
+    connect_args: dict[str, Any] = {}
+    timeout = settings.POSTGRES_STATEMENT_TIMEOUT_MS
+    if settings.POSTGRES_PGBOUNCER:
+        # Prepared statements live on a server connection, which PgBouncer
+        # hands to another client at the end of every transaction
+        connect_args["prepare_threshold"] = None
+    elif timeout > 0:
+        # Sent in the startup packet, no extra round trip per connection
+        connect_args["options"] = f"-c statement_timeout={timeout}"
+    if is_async:
+        pool_size = settings.POSTGRES_ASYNC_POOL_SIZE
+        max_overflow = settings.POSTGRES_ASYNC_MAX_OVERFLOW
+    else:
+        pool_size = settings.POSTGRES_POOL_SIZE
+        max_overflow = settings.POSTGRES_MAX_OVERFLOW
+    return {
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.POSTGRES_POOL_TIMEOUT,
+        "pool_recycle": settings.POSTGRES_POOL_RECYCLE,
+        "pool_pre_ping": settings.POSTGRES_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+def set_local_statement_timeout(engine: Engine) -> None:
+    """
+    Apply the statement timeout to every transaction of `engine`.
+
+    PgBouncer rejects the `options` startup parameter, and a session level
+    `SET` would leak to the other clients of the server connection.
+    """
+    if not settings.POSTGRES_PGBOUNCER or settings.POSTGRES_STATEMENT_TIMEOUT_MS <= 0:
+        return
+
+    @event.listens_for(engine, "begin")
+    def begin(connection: Any) -> None:
+        connection.exec_driver_sql(
+            f"SET LOCAL statement_timeout = {settings.POSTGRES_STATEMENT_TIMEOUT_MS}"
+        )
+
+
+def collect_pool_stats(name: str, engine: Engine) -> dict[str, Any]:
+    pool = engine.pool
+    assert isinstance(pool, TimedQueuePool)
+    metrics = pool.metrics
+    checkouts = metrics.checkouts
+    return {
+        "name": name,
+        "size": pool.size(),
+        "max_overflow": pool.max_overflow,
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": checkouts,
+        "timeouts": metrics.timeouts,
+        "wait_seconds_avg": metrics.wait_seconds_total / checkouts if checkouts else 0,
+        "wait_seconds_max": metrics.wait_seconds_max,
+    }
@@ -0,0 +1,92 @@
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    """
+    Statements a request sent to the database and the time it waited on
+    them.
+    """
+
+    request: str
+    count: int = 0
+    seconds: float = 0.0
+
+
+# Set by `MetricsMiddleware` for the duration of a request. Threadpool and
+# `run_sync` calls see the same object, statements run outside of a request
+# (background threads, scripts) are not attributed to anything.
+current_query_stats: ContextVar[QueryStats | None] = ContextVar(
+    "current_query_stats", default=None
+)
+
+_LITERALS = re.compile(
+    r"'(?:[^']|'')*'"  # strings
+    r"|%\(\w+\)s|%s|\$\d+"  # bound parameters
+    r"|\b\d+(?:\.\d+)?\b"  # numbers
+)
+_LISTS = re.compile(r"\(\?(?:\s*,\s*\?)+\)")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    Replace the values of `statement` with `?` and collapse its whitespace,
+    so that the same query with other values or another number of `IN`
+    items reads the same in the slow query log.
+    """
+    statement = _LITERALS.sub("?", statement)
+    statement = _LISTS.sub("(...)", statement)
+    return _SPACES.sub(" ", statement).strip()
+
+
+def instrument(engine: Engine) -> None:
+    """
+    Count and time the statements of `engine` for the current request, and
+    log the ones slower than `SLOW_QUERY_THRESHOLD_MS`.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn: Any, *_: Any) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context: Any) -> None:
+        # A failed statement never reaches after_cursor_execute
+        starts = (
+            context.connection.info.get("query_start") if context.connection else None
+        )
+        if starts:
+            starts.pop()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn: Any, _cursor: Any, statement: str, *_: Any) -> None:
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        if threshold > 0 and seconds * 1000 >= threshold:
+            logger.warning(
+                json.dumps(
+                    {
+                        "event": "slow_query",
+                        "duration_ms": round(seconds * 1000, 1),
+                        "request": stats.request if stats else None,
+                        "statement": normalize_sql(statement),
+                    }
+                )
+            )
@@ -0,0 +1,48 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+
+
+class RateLimiter:
+    """
+    Token buckets of `burst` tokens refilled at `rate` tokens per second, one
+    per key. Only the `maxsize` most recently used keys are remembered, a
+    forgotten key starts again with a full bucket.
+    """
+
+    def __init__(self, name: str, *, rate: float, burst: int, maxsize: int) -> None:
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self.allowed = 0
+        self.limited = 0
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable) -> int:
+        """
+        Take a token from the bucket of `key`. Returns 0 when one was left,
+        otherwise the seconds until the next one.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(self.burst), now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                self.allowed += 1
+                retry_after = 0
+            else:
+                self.limited += 1
+                retry_after = max(1, math.ceil((1 - tokens) / self.rate))
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
@@ -0,0 +1,149 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy.orm import Session
+from sqlmodel import col, select
+
+from app.core.config import settings
+from app.models import RevokedToken
+
+
+class BloomFilter:
+    """
+    Set of strings answering "maybe" or "definitely not", in a fixed number
+    of bits sized for `capacity` items at `error_rate` false positives.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> list[int]:
+        # Double hashing, the k positions come from two 64 bit halves
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class RevocationList:
+    """
+    Revoked access tokens, mirrored in a Bloom filter of the worker so that
+    only the tokens it might contain are looked up in the database.
+
+    The filter is kept up to date by loading the rows revoked since the last
+    refresh, at most every `refresh_interval` seconds. Tokens revoked by this
+    worker are added right away. It is rebuilt from scratch every
+    `rebuild_interval` seconds to drop the tokens which have expired since.
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int,
+        error_rate: float,
+        refresh_interval: float,
+        rebuild_interval: float,
+    ) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.lookups = 0
+        self.db_checks = 0
+        self.false_positives = 0
+        self._filter = BloomFilter(capacity, error_rate)
+        self._refreshed_at = -math.inf
+        self._rebuilt_at = -math.inf
+        self._synced_until: datetime | None = None
+        self._lock = threading.Lock()
+
+    def add(self, jti: str) -> None:
+        # Refreshes overlap, count every token once
+        if jti not in self._filter:
+            self._filter.add(jti)
+
+    def is_revoked(self, session: Session, jti: str) -> bool:
+        self.refresh(session)
+        self.lookups += 1
+        if jti not in self._filter:
+            return False
+        self.db_checks += 1
+        revoked = session.get(RevokedToken, jti) is not None
+        self.false_positives += not revoked
+        return revoked
+
+    def refresh(self, session: Session, *, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._refreshed_at < self.refresh_interval:
+            return
+        # One request refreshes, the others keep using the current filter
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            started = datetime.now()
+            statement = select(RevokedToken.jti).where(
+                col(RevokedToken.expires_at) > started
+            )
+            rebuild = (
+                now - self._rebuilt_at >= self.rebuild_interval
+                or self._filter.count >= self._filter.capacity
+            )
+            if not rebuild and self._synced_until is not None:
+                statement = statement.where(
+                    col(RevokedToken.revoked_at) >= self._synced_until
+                )
+            jtis = session.execute(statement).scalars().all()
+            if rebuild:
+                bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+                for jti in jtis:
+                    bloom.add(jti)
+                self._filter = bloom
+                self._rebuilt_at = now
+            else:
+                for jti in jtis:
+                    self.add(jti)
+            # Overlap the next window, rows are stamped by the clock of the
+            # worker revoking them and committed a little later
+            self._synced_until = started - timedelta(seconds=self.refresh_interval)
+            self._refreshed_at = now
+        finally:
+            self._lock.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "capacity": self._filter.capacity,
+            "entries": self._filter.count,
+            "lookups": self.lookups,
+            "db_checks": self.db_checks,
+            "false_positives": self.false_positives,
+        }
+
+
+revocation_list = RevocationList(
+    capacity=settings.TOKEN_REVOCATION_CAPACITY,
+    error_rate=settings.TOKEN_REVOCATION_ERROR_RATE,
+    refresh_interval=settings.TOKEN_REVOCATION_REFRESH_SECONDS,
+    rebuild_interval=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
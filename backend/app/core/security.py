@@ -1,3 +1,6 @@
+import hashlib
+import secrets
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
@@ -5,8 +8,25 @@ import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.hashing import HashingPool
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Every scheme but the default one is deprecated, and `min_rounds` makes
+# hashes with fewer rounds than configured need an update too
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    default=settings.PASSWORD_HASH_SCHEME,
+    deprecated="auto",
+    argon2__type="ID",
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST_KIB,
+    argon2__rounds=settings.ARGON2_TIME_COST,
+    argon2__min_rounds=settings.ARGON2_TIME_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM,
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
+hashing_pool = HashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS, max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
 
 
 ALGORITHM = "HS256"
@@ -14,14 +34,54 @@ ALGORITHM = "HS256"
 
 def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
-    to_encode = {"exp": expire, "sub": str(subject)}
+    # `jti` identifies the token in the revocation list
+    to_encode = {"exp": expire, "sub": str(subject), "jti": uuid.uuid4().hex}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def generate_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return hashing_pool.run(pwd_context.verify, plain_password, hashed_password)
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Verify the password and, when `hashed_password` does not follow the
+    current policy, hash it again with the policy.
+    """
+    return hashing_pool.run(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return hashing_pool.run(pwd_context.hash, password)
+
+
+# Async routes wait for the hashing pool without holding a threadpool thread
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_pool.run_async(
+        pwd_context.verify, plain_password, hashed_password
+    )
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return await hashing_pool.run_async(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await hashing_pool.run_async(pwd_context.hash, password)
@@ -1,10 +1,33 @@
 import uuid
+import hashlib
+from datetime import datetime, timedelta
 from typing import Any
 
-from sqlmodel import Session, select
+from sqlalchemy import orm
+from sqlmodel import Session, col, delete, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
-from app.models import User, UserCreate, UserUpdate, Post, PostCreate
+from app.core.cache import user_cache
+from app.core.config import settings
+from app.core.revocation import revocation_list
+from app.core.security import (
+    generate_refresh_token,
+    get_password_hash,
+    hash_refresh_token,
+    verify_and_update_password,
+    verify_and_update_password_async,
+)
+from app.models import (
+    ContactForm,
+    ContactFormBase,
+    Post,
+    PostCreate,
+    RefreshToken,
+    RevokedToken,
+    User,
+    UserCreate,
+    UserUpdate,
+)
 
 
 def create_user(*, session: Session, user_create: UserCreate) -> User:
@@ -24,9 +47,12 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
         password = user_data["password"]
         hashed_password = get_password_hash(password)
         extra_data["hashed_password"] = hashed_password
+        revoke_refresh_tokens(session=session, user_id=db_user.id)
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
     session.commit()
+    # Deactivations and role changes apply to the next request of the user
+    user_cache.pop(str(db_user.id))
     session.refresh(db_user)
     return db_user
 
@@ -37,14 +63,159 @@ def get_user_by_email(*, session: Session, email: str) -> User | None:
     return session_user
 
 
+async def get_user_by_email_async(*, session: AsyncSession, email: str) -> User | None:
+    statement = select(User).where(User.email == email)
+    return (await session.exec(statement)).first()
+
+
 def authenticate(*, session: Session, email: str, password: str) -> User | None:
     db_user = get_user_by_email(session=session, email=email)
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    verified, new_hash = verify_and_update_password(password, db_user.hashed_password)
+    if not verified:
+        return None
+    if new_hash is not None:
+        # Upgrade legacy bcrypt hashes and outdated parameters
+        db_user.hashed_password = new_hash
+        session.add(db_user)
+        session.commit()
+        session.refresh(db_user)
+        user_cache.pop(str(db_user.id))
+    return db_user
+
+
+async def authenticate_async(
+    *, session: AsyncSession, email: str, password: str
+) -> User | None:
+    """
+    `authenticate` for async routes, no thread is held while the password
+    is checked.
+    """
+    db_user = await get_user_by_email_async(session=session, email=email)
+    if not db_user:
+        return None
+    verified, new_hash = await verify_and_update_password_async(
+        password, db_user.hashed_password
+    )
+    if not verified:
         return None
+    if new_hash is not None:
+        # Upgrade legacy bcrypt hashes and outdated parameters
+        db_user.hashed_password = new_hash
+        session.add(db_user)
+        await session.commit()
+        await session.refresh(db_user)
+        user_cache.pop(str(db_user.id))
     return db_user
 
+
+def create_refresh_token(
+    *, session: orm.Session, user_id: uuid.UUID, family_id: uuid.UUID | None = None
+) -> str:
+    """
+    Store a new refresh token of the user and return it, it is not
+    recoverable from the database afterwards.
+
+    Async routes call it through `AsyncSession.run_sync`.
+    """
+    token = generate_refresh_token()
+    now = datetime.now()
+    if family_id is None:
+        # A new login, drop the expired tokens of the previous ones
+        session.execute(
+            delete(RefreshToken).where(
+                col(RefreshToken.user_id) == user_id,
+                col(RefreshToken.expires_at) < now,
+            )
+        )
+    session.add(
+        RefreshToken(
+            token_hash=hash_refresh_token(token),
+            user_id=user_id,
+            family_id=family_id or uuid.uuid4(),
+            created_at=now,
+            expires_at=now + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES),
+        )
+    )
+    session.commit()
+    return token
+
+
+def get_refresh_token(*, session: Session, token: str) -> RefreshToken | None:
+    statement = select(RefreshToken).where(
+        RefreshToken.token_hash == hash_refresh_token(token)
+    )
+    return session.exec(statement).first()
+
+
+def rotate_refresh_token(
+    *, session: Session, token: str
+) -> tuple[uuid.UUID, str] | None:
+    """
+    Exchange a refresh token for a new one of the same family.
+
+    Returns the id of the user and the new token, `None` if `token` is
+    unknown, expired or already used. Using a token twice means it was
+    copied, so the whole family is revoked and the login has to be redone.
+    """
+    statement = (
+        select(RefreshToken)
+        .where(RefreshToken.token_hash == hash_refresh_token(token))
+        .with_for_update()
+    )
+    db_token = session.exec(statement).first()
+    if db_token is None:
+        return None
+    if db_token.revoked_at is not None:
+        revoke_refresh_tokens(session=session, family_id=db_token.family_id)
+        session.commit()
+        return None
+    now = datetime.now()
+    if db_token.expires_at <= now:
+        session.rollback()
+        return None
+    db_token.revoked_at = now
+    session.add(db_token)
+    # Committed together with the new token
+    new_token = create_refresh_token(
+        session=session, user_id=db_token.user_id, family_id=db_token.family_id
+    )
+    return db_token.user_id, new_token
+
+
+def revoke_refresh_tokens(
+    *,
+    session: orm.Session,
+    user_id: uuid.UUID | None = None,
+    family_id: uuid.UUID | None = None,
+) -> None:
+    """
+    Revoke the live refresh tokens of a user or of a single login, the
+    caller commits. Async routes call it through `AsyncSession.run_sync`.
+    """
+    statement = update(RefreshToken).where(col(RefreshToken.revoked_at).is_(None))
+    if user_id is not None:
+        statement = statement.where(col(RefreshToken.user_id) == user_id)
+    if family_id is not None:
+        statement = statement.where(col(RefreshToken.family_id) == family_id)
+    session.execute(statement.values(revoked_at=datetime.now()))
+
+
+def revoke_access_token(*, session: Session, jti: str, expires_at: datetime) -> None:
+    """
+    Reject the access token `jti` until it expires. This worker stops
+    accepting it right away, the others at their next revocation refresh.
+    """
+    now = datetime.now()
+    if expires_at <= now:
+        return
+    session.execute(delete(RevokedToken).where(col(RevokedToken.expires_at) <= now))
+    session.merge(RevokedToken(jti=jti, expires_at=expires_at, revoked_at=now))
+    session.commit()
+    revocation_list.add(jti)
+
+
 def create_post(*, session: Session, post_in: PostCreate, ) -> Post:
     # Get the user who sent the request
     db_post = Post.model_validate(post_in)
@@ -53,3 +224,36 @@ def create_post(*, session: Session, post_in: PostCreate, ) -> Post:
     session.refresh(db_post)
     return db_post
 
+
+def create_contact_form(
+    *, session: Session, contact_form_in: ContactFormBase
+) -> tuple[ContactForm, bool]:
+    """
+    Store a contact request, unless the same sender sent the same message
+    within `CONTACT_DUPLICATE_TTL_SECONDS`. Returns the stored request and
+    whether it is new, the caller commits.
+    """
+    normalized = "\0".join(
+        (
+            contact_form_in.email.strip().lower(),
+            " ".join(contact_form_in.message.split()).lower(),
+        )
+    )
+    content_hash = hashlib.sha256(normalized.encode()).hexdigest()
+    since = datetime.now() - timedelta(seconds=settings.CONTACT_DUPLICATE_TTL_SECONDS)
+    statement = (
+        select(ContactForm)
+        .where(
+            ContactForm.content_hash == content_hash,
+            col(ContactForm.created_at) > since,
+        )
+        .limit(1)
+    )
+    duplicate = session.exec(statement).first()
+    if duplicate is not None:
+        return duplicate, False
+    contact_form = ContactForm.model_validate(
+        contact_form_in, update={"content_hash": content_hash}
+    )
+    session.add(contact_form)
+    return contact_form, True
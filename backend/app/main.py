@@ -1,10 +1,27 @@
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from functools import partial
+
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
+from app.api.middleware import (
+    CompressionMiddleware,
+    MetricsMiddleware,
+    PublicCacheMiddleware,
+)
+from app.api.routes import metrics
+from app.core.cache import response_cache
 from app.core.config import settings
+from app.core.db import async_engine, engine
+from app.core.hashing import HashingBusy
+from app.core.invalidation import InvalidationListener, publish
+from app.core.outbox import email_dispatcher
+from app.utils import compile_email_templates
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -12,14 +29,50 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 
 
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
-    sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
+    sentry_sdk.init(
+        dsn=str(settings.SENTRY_DSN),
+        traces_sample_rate=settings.SENTRY_TRACES_SAMPLE_RATE,
+    )
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
+    compile_email_templates()
+    listener = None
+    if settings.RESPONSE_CACHE_TTL_SECONDS > 0:
+        # Keep the response caches of all the workers coherent
+        listener = InvalidationListener(engine, response_cache)
+        listener.start()
+        response_cache.publish = partial(publish, engine)
+    if settings.emails_enabled:
+        email_dispatcher.start()
+    yield
+    if settings.emails_enabled:
+        email_dispatcher.stop()
+    if listener is not None:
+        response_cache.publish = None
+        listener.stop()
+    # Pooled async connections belong to the event loop that opened them
+    await async_engine.dispose()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    # Encodes the responses of the routes that return plain objects
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 print(settings.model_dump_json(indent=2))
+app.add_middleware(
+    PublicCacheMiddleware,
+    cache=response_cache,
+    prefix=settings.API_V1_STR,
+    namespaces=["posts", "events", "lectures", "groups"],
+)
+# Outside the cache, which stores and serves its own compressed copies
+app.add_middleware(CompressionMiddleware)
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
     settings.BACKEND_CORS_ORIGINS = [
@@ -43,5 +96,18 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+# Outermost, so that the time spent in the other middlewares is measured
+app.add_middleware(MetricsMiddleware, route_id=custom_generate_unique_id)
+
+
+@app.exception_handler(HashingBusy)
+async def hashing_busy_handler(_: Request, exc: HashingBusy) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+app.include_router(metrics.router, tags=["metrics"])
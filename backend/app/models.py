@@ -2,6 +2,7 @@ import uuid
 
 from datetime import datetime
 from pydantic import EmailStr
+from sqlalchemy import Index, text
 from sqlmodel import Field, Relationship, SQLModel
 
 # Shared properties
@@ -58,7 +59,10 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    # None when the caller asked for `count=none`
+    count: int | None
+    has_more: bool = False
+    next_cursor: str | None = None
 
 
 class GroupBase(SQLModel):
@@ -97,9 +101,40 @@ class PostPublic(PostBase):
 
 class PostsPublic(SQLModel):
     posts: list[PostPublic]
-    count: int
+    # None when the caller asked for `count=none`
+    count: int | None
+    has_more: bool = False
+    next_cursor: str | None = None
+
+# Card of a post in a list, without its text or its lectures
+class PostSummary(SQLModel):
+    id: int
+    title: str
+    image: str | None = None
+    is_visible: bool | None = True
+    group_id: int | None = None
+
+class PostsSummary(SQLModel):
+    posts: list[PostSummary]
+    # None when the caller asked for `count=none`
+    count: int | None
+    has_more: bool = False
+    next_cursor: str | None = None
 
 class Post(PostBase, table=True):
+    # Posts are listed per group, newest first, and anonymous visitors only
+    # see the visible ones
+    __table_args__ = (
+        Index("ix_post_group_id_created_at", "group_id", "created_at", "id"),
+        Index(
+            "ix_post_group_id_created_at_visible",
+            "group_id",
+            "created_at",
+            "id",
+            postgresql_where=text("is_visible = true"),
+        ),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     lectures: list["Lecture"] = Relationship(back_populates="post", cascade_delete=True)
     group_id: int = Field(foreign_key="group.id", default=1, ondelete="SET NULL", nullable=True)
@@ -121,6 +156,15 @@ class EventUpdate(EventBase):
     pass
 
 class Event(EventBase, table=True):
+    __table_args__ = (
+        Index(
+            "ix_event_start_visible",
+            "start",
+            "id",
+            postgresql_where=text("is_visible = true"),
+        ),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.now)
     created_by: uuid.UUID = Field(foreign_key="user.id", nullable=True, ondelete="SET NULL")
@@ -132,7 +176,27 @@ class EventPublic(EventBase):
 
 class EventsPublic(SQLModel):
     events: list[EventPublic]
-    count: int
+    # None when the caller asked for `count=none`
+    count: int | None
+    has_more: bool = False
+    next_cursor: str | None = None
+
+# Card of an event in a list, without its text
+class EventSummary(SQLModel):
+    id: int
+    title: str
+    image: str | None = None
+    is_visible: bool | None = True
+    start: datetime
+    end: datetime
+    location: str
+
+class EventsSummary(SQLModel):
+    events: list[EventSummary]
+    # None when the caller asked for `count=none`
+    count: int | None
+    has_more: bool = False
+    next_cursor: str | None = None
 
 class LectureBase(SQLModel):
     title: str
@@ -140,9 +204,18 @@ class LectureBase(SQLModel):
     end: datetime
     location: str
     is_visible: bool | None = Field(default=True)
-    post_id: int | None = Field(foreign_key="post.id", default=None, ondelete="CASCADE")
+    post_id: int | None = Field(foreign_key="post.id", default=None, ondelete="CASCADE", index=True)
 
 class Lecture(LectureBase, table=True):
+    __table_args__ = (
+        Index(
+            "ix_lecture_start_visible",
+            "start",
+            "id",
+            postgresql_where=text("is_visible = true"),
+        ),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     
     post: Post | None = Relationship(back_populates="lectures")
@@ -176,7 +249,10 @@ class LecturePublic(LectureBase):
 
 class LecturesPublic(SQLModel):
     lectures: list[LecturePublic]
-    count: int
+    # None when the caller asked for `count=none`
+    count: int | None
+    has_more: bool = False
+    next_cursor: str | None = None
 
 
 class ContactFormBase(SQLModel):
@@ -184,9 +260,40 @@ class ContactFormBase(SQLModel):
     email: str
     message: str
     
-class ContactForm(ContactFormBase):
-    id: uuid.UUID = Field(default_factory=uuid.uuid4)
+class ContactForm(ContactFormBase, table=True):
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.now)
+    # Of the sender and the message, to ignore resubmissions
+    content_hash: str = Field(max_length=64, index=True)
+
+class ContactFormPublic(ContactFormBase):
+    id: uuid.UUID
+    created_at: datetime
+
+
+# Emails waiting to be sent by the outbox dispatcher
+class EmailOutbox(SQLModel, table=True):
+    # The dispatcher only scans the pending emails, the earliest due first
+    __table_args__ = (
+        Index(
+            "ix_emailoutbox_pending_next_attempt_at",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    email_to: str = Field(max_length=255)
+    subject: str
+    # Emptied once sent, new account emails contain the password
+    html_content: str
+    # pending, sent or failed
+    status: str = Field(default="pending", max_length=16)
+    attempts: int = 0
+    last_error: str | None = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    next_attempt_at: datetime = Field(default_factory=datetime.now)
+    sent_at: datetime | None = None
 
 
 # Generic message
@@ -194,15 +301,83 @@ class Message(SQLModel):
     message: str
 
 
+class CacheStats(SQLModel):
+    name: str
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class PoolStats(SQLModel):
+    name: str
+    size: int
+    max_overflow: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_seconds_avg: float
+    wait_seconds_max: float
+
+
+class HashingStats(SQLModel):
+    workers: int
+    max_queue: int
+    queued: int
+    running: int
+    completed: int
+    rejected: int
+    wait_seconds_avg: float
+    hash_seconds_avg: float
+    hash_seconds_max: float
+
+
+class RevocationStats(SQLModel):
+    capacity: int
+    entries: int
+    lookups: int
+    db_checks: int
+    false_positives: int
+
+
 # JSON payload containing access token
 class Token(SQLModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: str | None = None
+
+
+class RefreshTokenRequest(SQLModel):
+    refresh_token: str
+
+
+# Refresh tokens are random, a SHA-256 of them is as safe to store as a slow
+# password hash and can be looked up through an index
+class RefreshToken(SQLModel, table=True):
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    token_hash: str = Field(unique=True, index=True, max_length=64)
+    user_id: uuid.UUID = Field(foreign_key="user.id", ondelete="CASCADE", index=True)
+    # Shared by every token rotated from the same login
+    family_id: uuid.UUID = Field(index=True)
+    created_at: datetime = Field(default_factory=datetime.now)
+    expires_at: datetime
+    revoked_at: datetime | None = None
 
 
 # Contents of JWT token
 class TokenPayload(SQLModel):
     sub: str | None = None
+    jti: str | None = None
+    exp: int | None = None
+
+
+# Access tokens revoked before they expire, the rows can go once they have
+class RevokedToken(SQLModel, table=True):
+    jti: str = Field(primary_key=True, max_length=32)
+    expires_at: datetime = Field(index=True)
+    revoked_at: datetime = Field(default_factory=datetime.now, index=True)
 
 
 class NewPassword(SQLModel):
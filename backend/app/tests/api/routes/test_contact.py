@@ -0,0 +1,101 @@
+from collections.abc import Generator
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.api.routes.contact import email_limiter, ip_limiter
+from app.core.config import settings
+from app.models import ContactForm, EmailOutbox
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+@pytest.fixture(autouse=True)
+def clear_limiters() -> Generator[None, None, None]:
+    ip_limiter.clear()
+    email_limiter.clear()
+    with (
+        patch("app.core.config.settings.SMTP_HOST", "smtp.example.com"),
+        patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
+        # Keep the dispatcher of the test client from sending the emails
+        patch("app.core.outbox.email_dispatcher.wake"),
+    ):
+        yield
+
+
+def contact_data() -> dict[str, str]:
+    return {
+        "name": random_lower_string(),
+        "email": random_email(),
+        "message": random_lower_string(),
+    }
+
+
+def test_contact_is_accepted_and_queued(client: TestClient, db: Session) -> None:
+    data = contact_data()
+    r = client.post(f"{settings.API_V1_STR}/contact/", json=data)
+    assert r.status_code == 202
+    content = r.json()
+    assert content["email"] == data["email"]
+    assert "content_hash" not in content
+
+    contact_form = db.get(ContactForm, content["id"])
+    assert contact_form
+    assert contact_form.message == data["message"]
+    statement = select(EmailOutbox).where(
+        EmailOutbox.email_to == settings.FIRST_SUPERUSER,
+        EmailOutbox.html_content.contains(data["message"]),  # type: ignore[attr-defined]
+    )
+    assert len(db.exec(statement).all()) == 1
+
+
+def test_contact_duplicate_is_not_stored_twice(client: TestClient, db: Session) -> None:
+    data = contact_data()
+    r = client.post(f"{settings.API_V1_STR}/contact/", json=data)
+    first = r.json()
+    data["message"] = f"  {data['message'].upper()} "
+    r = client.post(f"{settings.API_V1_STR}/contact/", json=data)
+    assert r.status_code == 202
+    assert r.json()["id"] == first["id"]
+
+    statement = select(ContactForm).where(ContactForm.email == data["email"])
+    assert len(db.exec(statement).all()) == 1
+
+
+def test_contact_is_rate_limited_per_client(client: TestClient) -> None:
+    for _ in range(settings.CONTACT_RATE_LIMIT_BURST):
+        r = client.post(f"{settings.API_V1_STR}/contact/", json=contact_data())
+        assert r.status_code == 202
+    r = client.post(f"{settings.API_V1_STR}/contact/", json=contact_data())
+    assert r.status_code == 429
+    assert int(r.headers["retry-after"]) > 0
+
+
+def test_contact_is_rate_limited_per_forwarded_client(client: TestClient) -> None:
+    url = f"{settings.API_V1_STR}/contact/"
+    first = {"X-Forwarded-For": "203.0.113.1"}
+    # Addresses before the ones appended by the trusted proxies are ignored
+    spoofed = {"X-Forwarded-For": "198.51.100.7, 203.0.113.1"}
+    second = {"X-Forwarded-For": "203.0.113.2"}
+    with patch("app.core.config.settings.FORWARDED_PROXY_HOPS", 1):
+        for _ in range(settings.CONTACT_RATE_LIMIT_BURST):
+            r = client.post(url, json=contact_data(), headers=first)
+            assert r.status_code == 202
+        r = client.post(url, json=contact_data(), headers=spoofed)
+        assert r.status_code == 429
+        r = client.post(url, json=contact_data(), headers=second)
+        assert r.status_code == 202
+
+
+def test_contact_is_rate_limited_per_email(client: TestClient) -> None:
+    email = random_email()
+    for _ in range(settings.CONTACT_RATE_LIMIT_BURST):
+        data = contact_data() | {"email": email}
+        r = client.post(f"{settings.API_V1_STR}/contact/", json=data)
+        assert r.status_code == 202
+    ip_limiter.clear()
+    r = client.post(
+        f"{settings.API_V1_STR}/contact/", json=contact_data() | {"email": email}
+    )
+    assert r.status_code == 429
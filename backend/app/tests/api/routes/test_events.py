@@ -0,0 +1,81 @@
+from datetime import timedelta, timezone
+from email.utils import format_datetime
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.tests.utils.event import create_random_event
+from app.tests.utils.utils import query_budget
+
+
+def test_read_events(client: TestClient, db: Session) -> None:
+    events = [create_random_event(db) for _ in range(5)]
+    hidden = create_random_event(db, is_visible=False)
+    # the page counted by a window function, its ETag comes from the rows
+    with query_budget(1):
+        r = client.get(f"{settings.API_V1_STR}/events/")
+    assert r.status_code == 200
+    ids = [event["id"] for event in r.json()["events"]]
+    assert {event.id for event in events} <= set(ids)
+    assert hidden.id not in ids
+
+
+def test_read_events_summary(client: TestClient, db: Session) -> None:
+    for _ in range(5):
+        create_random_event(db)
+    with query_budget(1):
+        r = client.get(f"{settings.API_V1_STR}/events/", params={"view": "summary"})
+    assert r.status_code == 200
+    assert "content" not in r.json()["events"][0]
+
+
+def test_read_event(client: TestClient, db: Session) -> None:
+    event = create_random_event(db)
+    with query_budget(1):
+        r = client.get(f"{settings.API_V1_STR}/events/{event.id}")
+    assert r.status_code == 200
+    assert r.json()["title"] == event.title
+
+
+def test_read_event_hidden(client: TestClient, db: Session) -> None:
+    event = create_random_event(db, is_visible=False)
+    with query_budget(1):
+        r = client.get(f"{settings.API_V1_STR}/events/{event.id}")
+    assert r.status_code == 404
+
+
+def test_read_event_not_modified(client: TestClient, db: Session) -> None:
+    event = create_random_event(db)
+    url = f"{settings.API_V1_STR}/events/{event.id}"
+    r = client.get(url)
+    etag = r.headers["etag"]
+    last_modified = r.headers["last-modified"]
+
+    response_cache.clear()
+    with query_budget(1):
+        r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    response_cache.clear()
+    r = client.get(url, headers={"If-Modified-Since": last_modified})
+    assert r.status_code == 304
+    earlier = event.last_updated - timedelta(days=1)
+    since = format_datetime(earlier.replace(tzinfo=timezone.utc), usegmt=True)
+    r = client.get(url, headers={"If-Modified-Since": since})
+    assert r.status_code == 200
+    assert r.json()["id"] == event.id
+
+
+def test_read_events_not_modified(client: TestClient, db: Session) -> None:
+    for _ in range(3):
+        create_random_event(db)
+    url = f"{settings.API_V1_STR}/events/"
+    for view in ("full", "summary"):
+        r = client.get(url, params={"view": view})
+        etag = r.headers["etag"]
+        response_cache.clear()
+        # only the versions of the page
+        with query_budget(1):
+            r = client.get(url, params={"view": view}, headers={"If-None-Match": etag})
+        assert r.status_code == 304
@@ -0,0 +1,24 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.tests.utils.post import create_random_group
+from app.tests.utils.utils import query_budget
+
+
+def test_read_groups(client: TestClient, db: Session) -> None:
+    groups = [create_random_group(db) for _ in range(5)]
+    # count, groups
+    with query_budget(2):
+        r = client.get(f"{settings.API_V1_STR}/groups/")
+    assert r.status_code == 200
+    ids = {group["id"] for group in r.json()["groups"]}
+    assert {group.id for group in groups} <= ids
+
+
+def test_read_group(client: TestClient, db: Session) -> None:
+    group = create_random_group(db)
+    with query_budget(1):
+        r = client.get(f"{settings.API_V1_STR}/groups/{group.id}")
+    assert r.status_code == 200
+    assert r.json()["name"] == group.name
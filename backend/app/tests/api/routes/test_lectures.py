@@ -0,0 +1,27 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.tests.utils.post import create_random_group, create_random_post
+from app.tests.utils.utils import query_budget
+
+
+def test_read_lectures(client: TestClient, db: Session) -> None:
+    group = create_random_group(db)
+    for _ in range(3):
+        create_random_post(db, group=group, lectures=3)
+    # the page counted by a window function, its ETag comes from the rows
+    with query_budget(1):
+        r = client.get(f"{settings.API_V1_STR}/lectures/")
+    assert r.status_code == 200
+    assert len(r.json()["lectures"]) >= 9
+
+
+def test_read_lecture(client: TestClient, db: Session) -> None:
+    group = create_random_group(db)
+    post = create_random_post(db, group=group, lectures=1)
+    lecture = post.lectures[0]
+    with query_budget(1):
+        r = client.get(f"{settings.API_V1_STR}/lectures/{lecture.id}")
+    assert r.status_code == 200
+    assert r.json()["post_id"] == post.id
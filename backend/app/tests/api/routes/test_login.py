@@ -4,8 +4,10 @@ from fastapi.testclient import TestClient
 from sqlmodel import Session, select
 
 from app.core.config import settings
-from app.core.security import verify_password
-from app.models import User
+from app.core.hashing import HashingBusy
+from app.core.security import hashing_pool, verify_password
+from app.models import RefreshToken, User
+from app.tests.utils.user import create_logged_in_user, token_headers
 from app.utils import generate_password_reset_token
 
 
@@ -30,6 +32,105 @@ def test_get_access_token_incorrect_password(client: TestClient) -> None:
     assert r.status_code == 400
 
 
+def test_get_access_token_hashing_busy(client: TestClient) -> None:
+    login_data = {
+        "username": settings.FIRST_SUPERUSER,
+        "password": settings.FIRST_SUPERUSER_PASSWORD,
+    }
+    with patch.object(
+        hashing_pool, "run_async", side_effect=HashingBusy(retry_after=3)
+    ):
+        r = client.post(f"{settings.API_V1_STR}/login/access-token", data=login_data)
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "3"
+
+
+def test_refresh_token_rotates(client: TestClient, db: Session) -> None:
+    _, tokens = create_logged_in_user(client, db)
+    assert tokens["refresh_token"]
+
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert r.status_code == 200
+    refreshed = r.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+    r = client.post(
+        f"{settings.API_V1_STR}/login/test-token",
+        headers={"Authorization": f"Bearer {refreshed['access_token']}"},
+    )
+    assert r.status_code == 200
+
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": refreshed["refresh_token"]},
+    )
+    assert r.status_code == 200
+
+
+def test_refresh_token_reuse_revokes_the_login(client: TestClient, db: Session) -> None:
+    user, tokens = create_logged_in_user(client, db)
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    refreshed = r.json()
+
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid refresh token"
+    # the token handed out by the first rotation is revoked too
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": refreshed["refresh_token"]},
+    )
+    assert r.status_code == 400
+    statement = select(RefreshToken).where(RefreshToken.user_id == user.id)
+    assert all(token.revoked_at for token in db.exec(statement))
+
+
+def test_refresh_token_invalid(client: TestClient) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": "invalid"},
+    )
+    assert r.status_code == 400
+
+
+def test_logout_revokes_refresh_token(client: TestClient, db: Session) -> None:
+    _, tokens = create_logged_in_user(client, db)
+    r = client.post(
+        f"{settings.API_V1_STR}/logout",
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert r.status_code == 200
+    r = client.post(
+        f"{settings.API_V1_STR}/login/refresh-token",
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert r.status_code == 400
+
+
+def test_logout_revokes_access_token(client: TestClient, db: Session) -> None:
+    _, tokens = create_logged_in_user(client, db)
+    headers = token_headers(tokens)
+    r = client.post(f"{settings.API_V1_STR}/login/test-token", headers=headers)
+    assert r.status_code == 200
+
+    r = client.post(
+        f"{settings.API_V1_STR}/logout",
+        headers=headers,
+        json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert r.status_code == 200
+    r = client.post(f"{settings.API_V1_STR}/login/test-token", headers=headers)
+    assert r.status_code == 403
+
+
 def test_use_access_token(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -86,6 +187,8 @@ def test_reset_password(
     user = db.exec(user_query).first()
     assert user
     assert verify_password(data["new_password"], user.hashed_password)
+    tokens_query = select(RefreshToken).where(RefreshToken.user_id == user.id)
+    assert all(token.revoked_at for token in db.exec(tokens_query))
 
 
 def test_reset_password_invalid_token(
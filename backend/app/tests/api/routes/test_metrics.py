@@ -0,0 +1,71 @@
+import re
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.metrics import db_duration, db_statements, request_duration
+
+
+def sample(text: str, line: str) -> float:
+    for row in text.splitlines():
+        name, _, value = row.rpartition(" ")
+        if name == line:
+            return float(value)
+    return 0
+
+
+def test_metrics(client: TestClient) -> None:
+    for histogram in (request_duration, db_statements, db_duration):
+        histogram.clear()
+    url = f"{settings.API_V1_STR}/events/"
+    r = client.get(url)
+    assert r.headers["x-cache"] == "MISS"
+    queries = re.search(r'desc="(\d+) queries"', r.headers["server-timing"])
+    assert queries and int(queries[1]) > 0
+    # Served from the response cache, still counted for the route
+    r = client.get(url)
+    assert r.headers["x-cache"] == "HIT"
+    assert r.headers["server-timing"].startswith('db;dur=0.0;desc="0 queries"')
+    client.get(f"{settings.API_V1_STR}/no-such-route")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    text = r.text
+    labels = 'route="events-read_events",status="200"'
+    assert sample(text, f"http_request_duration_seconds_count{{{labels}}}") == 2
+    assert (
+        sample(text, f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}') == 2
+    )
+    labels = 'route="events-read_events"'
+    assert sample(text, f"http_request_db_statements_sum{{{labels}}}") == int(
+        queries[1]
+    )
+    labels = 'route="events-read_events",le="0"'
+    assert sample(text, f"http_request_db_statements_bucket{{{labels}}}") == 1
+    labels = 'route="unmatched",status="404"'
+    assert sample(text, f"http_request_duration_seconds_count{{{labels}}}") == 1
+    # The scrape itself is in flight
+    assert sample(text, "http_requests_in_flight") == 1
+    assert sample(text, 'cache_hits_total{name="responses"}') >= 1
+    assert "# TYPE db_pool_checked_out gauge" in text
+    assert 'hashing_completed_total{name="passwords"}' in text
+    assert 'revocation_entries{name="access_tokens"}' in text
+
+
+def test_metrics_token(client: TestClient) -> None:
+    with patch.object(settings, "METRICS_TOKEN", "secret"):
+        assert client.get("/metrics").status_code == 403
+        r = client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+        assert r.status_code == 403
+        r = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+        assert r.status_code == 200
+
+
+def test_metrics_without_token_only_served_locally(client: TestClient) -> None:
+    with patch.object(settings, "METRICS_TOKEN", None):
+        with patch.object(settings, "ENVIRONMENT", "production"):
+            assert client.get("/metrics").status_code == 404
+        with patch.object(settings, "ENVIRONMENT", "local"):
+            assert client.get("/metrics").status_code == 200
@@ -0,0 +1,341 @@
+from unittest.mock import patch
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api.pagination import MAX_PAGE_SIZE
+from app.core.cache import response_cache
+from app.core.compression import compress
+from app.core.config import settings
+from app.core.db import async_engine
+from app.models import PostPublic
+from app.tests.utils.post import create_random_group, create_random_post
+from app.tests.utils.utils import count_queries
+
+
+def test_read_posts(client: TestClient, db: Session) -> None:
+    group = create_random_group(db)
+    post = create_random_post(db, group=group, lectures=2)
+    create_random_post(db, group=group, is_visible=False)
+    r = client.get(f"{settings.API_V1_STR}/posts/", params={"group": group.id})
+    assert r.status_code == 200
+    content = r.json()
+    assert content["count"] == 1
+    assert [p["id"] for p in content["posts"]] == [post.id]
+    assert content["posts"][0]["group"]["id"] == group.id
+    assert len(content["posts"][0]["lectures"]) == 2
+
+
+def test_read_posts_query_count_is_independent_of_page_size(
+    client: TestClient, db: Session
+) -> None:
+    group = create_random_group(db)
+    for _ in range(10):
+        create_random_post(db, group=group, lectures=3)
+    params = {"group": group.id}
+    with count_queries(async_engine.sync_engine) as statements:
+        r = client.get(f"{settings.API_V1_STR}/posts/", params=params)
+    assert r.status_code == 200
+    assert len(r.json()["posts"]) == 10
+    # posts joined with their group and counted by a window function,
+    # lectures of the whole page, the ETag comes from the loaded rows
+    assert len(statements) == 2
+
+
+def test_read_posts_summary(client: TestClient, db: Session) -> None:
+    group = create_random_group(db)
+    post = create_random_post(db, group=group, lectures=3)
+    params = {"group": group.id, "view": "summary"}
+    with count_queries(async_engine.sync_engine) as statements:
+        r = client.get(f"{settings.API_V1_STR}/posts/", params=params)
+    assert r.status_code == 200
+    content = r.json()
+    assert content["count"] == 1
+    assert content["posts"] == [
+        {
+            "id": post.id,
+            "title": post.title,
+            "image": post.image,
+            "is_visible": True,
+            "group_id": group.id,
+        }
+    ]
+    # the page without the text columns and without the lectures
+    assert len(statements) == 1
+    assert "content" not in statements[0]
+    assert "description" not in statements[0]
+
+
+def test_read_post(client: TestClient, db: Session) -> None:
+    group = create_random_group(db)
+    post = create_random_post(db, group=group, lectures=3)
+    with count_queries(async_engine.sync_engine) as statements:
+        r = client.get(f"{settings.API_V1_STR}/posts/{post.id}")
+    assert r.status_code == 200
+    content = r.json()
+    assert content["title"] == post.title
+    assert content["group"]["name"] == group.name
+    assert len(content["lectures"]) == 3
+    # post joined with its group, lectures of the post
+    assert len(statements) == 2
+
+
+def test_read_post_matches_response_model(client: TestClient, db: Session) -> None:
+    group = create_random_group(db)
+    post = create_random_post(db, group=group, lectures=2)
+    r = client.get(f"{settings.API_V1_STR}/posts/{post.id}")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    assert "etag" in r.headers
+    content = r.json()
+    assert content == jsonable_encoder(PostPublic.model_validate(post))
+    # Only the fields of PostPublic are sent
+    assert "created_by" not in content
+
+
+def test_read_post_hidden(client: TestClient, db: Session) -> None:
+    group = create_random_group(db)
+    post = create_random_post(db, group=group, is_visible=False)
+    r = client.get(f"{settings.API_V1_STR}/posts/{post.id}")
+    assert r.status_code == 404
+    assert r.json()["detail"] == "Post not found"
+
+
+def test_read_posts_cursor_pagination(client: TestClient, db: Session) -> None:
+    group = create_random_group(db)
+    assert group.id is not None
+    posts = [create_random_post(db, group=group) for _ in range(5)]
+    expected = [p.id for p in sorted(posts, key=lambda p: (p.created_at, p.id))]
+    params: dict[str, str | int] = {
+        "group": group.id,
+        "pagination": "cursor",
+        "limit": 2,
+    }
+    seen = []
+    while True:
+        r = client.get(f"{settings.API_V1_STR}/posts/", params=params)
+        assert r.status_code == 200
+        content = r.json()
+        assert content["count"] == 5
+        seen += [p["id"] for p in content["posts"]]
+        if content["next_cursor"] is None:
+            break
+        params["after"] = content["next_cursor"]
+    assert seen == expected[::-1]
+
+
+def test_read_posts_offset_pagination_has_no_cursor(
+    client: TestClient, db: Session
+) -> None:
+    group = create_random_group(db)
+    for _ in range(3):
+        create_random_post(db, group=group)
+    params = {"group": group.id, "skip": 1, "limit": 1}
+    r = client.get(f"{settings.API_V1_STR}/posts/", params=params)
+    assert r.status_code == 200
+    content = r.json()
+    assert len(content["posts"]) == 1
+    assert content["next_cursor"] is None
+
+
+def test_read_posts_offset_pagination_uses_keyset_order(
+    client: TestClient, db: Session
+) -> None:
+    group = create_random_group(db)
+    posts = [create_random_post(db, group=group) for _ in range(5)]
+    expected = [p.id for p in sorted(posts, key=lambda p: (p.created_at, p.id))]
+    seen = []
+    for skip in range(0, 5, 2):
+        params = {"group": group.id, "skip": skip, "limit": 2}
+        r = client.get(f"{settings.API_V1_STR}/posts/", params=params)
+        assert r.status_code == 200
+        seen += [p["id"] for p in r.json()["posts"]]
+    assert seen == expected[::-1]
+
+
+def test_read_posts_page_size_is_bounded(client: TestClient) -> None:
+    url = f"{settings.API_V1_STR}/posts/"
+    invalid: list[dict[str, str | int]] = [
+        {"pagination": "cursor", "limit": 0},
+        {"limit": -1},
+        {"skip": -1},
+        {"limit": MAX_PAGE_SIZE + 1},
+    ]
+    for params in invalid:
+        r = client.get(url, params=params)
+        assert r.status_code == 422
+
+
+def test_read_posts_invalid_cursor(client: TestClient) -> None:
+    r = client.get(f"{settings.API_V1_STR}/posts/", params={"after": "not-a-cursor"})
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid cursor"
+
+
+def test_read_posts_count_strategies(client: TestClient, db: Session) -> None:
+    group = create_random_group(db)
+    for _ in range(3):
+        create_random_post(db, group=group)
+    url = f"{settings.API_V1_STR}/posts/"
+    params = {"group": group.id, "limit": 2}
+
+    r = client.get(url, params={**params, "count": "exact", "skip": 5})
+    assert r.json()["count"] == 3
+    assert r.json()["has_more"] is False
+
+    r = client.get(url, params={**params, "count": "estimated"})
+    assert isinstance(r.json()["count"], int)
+    assert r.json()["has_more"] is True
+
+    with count_queries(async_engine.sync_engine) as statements:
+        r = client.get(url, params={**params, "count": "none"})
+    content = r.json()
+    assert content["count"] is None
+    assert content["has_more"] is True
+    assert len(content["posts"]) == 2
+    assert not any("count(*)" in statement for statement in statements)
+
+
+def test_read_posts_anonymous_responses_are_cached(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    group = create_random_group(db)
+    create_random_post(db, group=group)
+    url = f"{settings.API_V1_STR}/posts/"
+    params = {"group": group.id}
+    r = client.get(url, params=params)
+    assert r.headers["x-cache"] == "MISS"
+    with count_queries(async_engine.sync_engine) as statements:
+        r = client.get(url, params=params)
+    assert r.headers["x-cache"] == "HIT"
+    assert r.json()["count"] == 1
+    assert statements == []
+
+    r = client.get(url, params=params, headers=superuser_token_headers)
+    assert "x-cache" not in r.headers
+
+    data = {"title": "New post", "group_id": group.id}
+    r = client.post(url, json=data, headers=superuser_token_headers)
+    assert r.status_code == 200
+    r = client.get(url, params=params)
+    assert r.headers["x-cache"] == "MISS"
+    assert r.json()["count"] == 2
+
+
+def test_read_posts_cached_responses_are_compressed_once(
+    client: TestClient, db: Session
+) -> None:
+    group = create_random_group(db)
+    for _ in range(5):
+        create_random_post(db, group=group, lectures=2)
+    url = f"{settings.API_V1_STR}/posts/"
+    params = {"group": group.id}
+    r = client.get(url, params=params, headers={"Accept-Encoding": "identity"})
+    assert r.headers["x-cache"] == "MISS"
+    assert "content-encoding" not in r.headers
+    assert r.headers["vary"] == "Accept-Encoding"
+    expected = r.json()
+
+    with patch("app.core.cache.compress", wraps=compress) as compress_mock:
+        for _ in range(3):
+            r = client.get(url, params=params, headers={"Accept-Encoding": "gzip, br"})
+            assert r.headers["x-cache"] == "HIT"
+            assert r.headers["content-encoding"] == "br"
+            assert r.json() == expected
+        r = client.get(url, params=params, headers={"Accept-Encoding": "gzip"})
+        assert r.headers["content-encoding"] == "gzip"
+        assert r.json() == expected
+    assert [call.args[1] for call in compress_mock.call_args_list] == ["br", "gzip"]
+
+
+def test_read_posts_not_modified(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    group = create_random_group(db)
+    post = create_random_post(db, group=group, lectures=1)
+    url = f"{settings.API_V1_STR}/posts/"
+    params = {"group": group.id}
+    # Logged in requests bypass the response cache and reach the route
+    headers = superuser_token_headers
+    r = client.get(url, params=params, headers=headers)
+    etag = r.headers["etag"]
+    assert "last-modified" not in r.headers
+
+    with count_queries(async_engine.sync_engine) as statements:
+        r = client.get(url, params=params, headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+    # only the versions of the page, the current user comes from the user cache
+    # and the posts are not loaded
+    assert len(statements) == 1
+
+    lecture = post.lectures[0]
+    r = client.put(
+        f"{settings.API_V1_STR}/lectures/{lecture.id}",
+        json={
+            "title": "Renamed",
+            "start": lecture.start.isoformat(),
+            "end": lecture.end.isoformat(),
+            "location": lecture.location,
+            "post_id": post.id,
+        },
+        headers=headers,
+    )
+    assert r.status_code == 200
+    r = client.get(url, params=params, headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+
+
+def test_read_post_not_modified(client: TestClient, db: Session) -> None:
+    group = create_random_group(db)
+    post = create_random_post(db, group=group, lectures=2)
+    url = f"{settings.API_V1_STR}/posts/{post.id}"
+    r = client.get(url)
+    etag = r.headers["etag"]
+    # Deleting a lecture would not move a Last-Modified forward
+    assert "last-modified" not in r.headers
+
+    # Served from the response cache
+    with count_queries(async_engine.sync_engine) as statements:
+        r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+    assert statements == []
+
+    response_cache.clear()
+    with count_queries(async_engine.sync_engine) as statements:
+        r = client.get(url, headers={"If-None-Match": f'"other", {etag}'})
+    assert r.status_code == 304
+    # only the version of the post
+    assert len(statements) == 1
+
+    db.delete(post.lectures[0])
+    db.commit()
+    response_cache.clear()
+    r = client.get(url, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
+    assert len(r.json()["lectures"]) == 1
+
+
+def test_read_posts_not_modified_views(client: TestClient, db: Session) -> None:
+    group = create_random_group(db)
+    for _ in range(3):
+        create_random_post(db, group=group, lectures=2)
+    url = f"{settings.API_V1_STR}/posts/"
+    etags = set()
+    for view in ("full", "summary"):
+        params = {"group": group.id, "view": view}
+        r = client.get(url, params=params)
+        etag = r.headers["etag"]
+        etags.add(etag)
+        response_cache.clear()
+        # the versions of the page match the ones computed from the loaded rows
+        with count_queries(async_engine.sync_engine) as statements:
+            r = client.get(url, params=params, headers={"If-None-Match": etag})
+        assert r.status_code == 304
+        assert len(statements) == 1
+    assert len(etags) == 2
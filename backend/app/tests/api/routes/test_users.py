@@ -5,10 +5,22 @@ from fastapi.testclient import TestClient
 from sqlmodel import Session, select
 
 from app import crud
+from app.core.cache import token_cache, user_cache
 from app.core.config import settings
+from app.core.db import engine
 from app.core.security import verify_password
-from app.models import User, UserCreate
-from app.tests.utils.utils import random_email, random_lower_string
+from app.models import User, UserCreate, UserUpdate
+from app.tests.utils.user import (
+    create_logged_in_user,
+    random_user_in,
+    token_headers,
+)
+from app.tests.utils.utils import (
+    count_queries,
+    query_budget,
+    random_email,
+    random_lower_string,
+)
 
 
 def test_get_users_superuser_me(
@@ -484,3 +496,73 @@ def test_delete_user_without_privileges(
     )
     assert r.status_code == 403
     assert r.json()["detail"] == "The user doesn't have enough privileges"
+
+
+def test_current_user_is_cached(client: TestClient, db: Session) -> None:
+    user, tokens = create_logged_in_user(client, db)
+    headers = token_headers(tokens)
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 200
+    with count_queries(engine) as statements:
+        r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 200
+    assert r.json()["email"] == user.email
+    assert statements == []
+
+
+def test_deactivated_user_is_evicted_from_cache(
+    client: TestClient, db: Session
+) -> None:
+    user, tokens = create_logged_in_user(client, db)
+    headers = token_headers(tokens)
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 200
+    user_in = UserUpdate.model_validate(user.model_dump() | {"is_active": False})
+    crud.update_user(session=db, db_user=user, user_in=user_in)
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Inactive user"
+
+
+def test_deleted_user_is_evicted_from_cache(client: TestClient, db: Session) -> None:
+    _, tokens = create_logged_in_user(client, db)
+    headers = token_headers(tokens)
+    r = client.delete(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 404
+
+
+def test_read_users_query_budget(client: TestClient, db: Session) -> None:
+    for _ in range(5):
+        user_in = random_user_in(email=random_email(), password=random_lower_string())
+        user_in.is_public = True
+        crud.create_user(session=db, user_create=user_in)
+    # the page counted by a window function
+    with query_budget(1):
+        r = client.get(f"{settings.API_V1_STR}/users/")
+    assert r.status_code == 200
+    assert len(r.json()["data"]) >= 5
+
+
+def test_read_user_me_query_budget(client: TestClient, db: Session) -> None:
+    _, tokens = create_logged_in_user(client, db)
+    headers = token_headers(tokens)
+    user_cache.clear()
+    token_cache.clear()
+    # the user, the revoked tokens added since the last refresh of the filter
+    with query_budget(2):
+        r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 200
+
+
+def test_read_user_by_id_query_budget(client: TestClient, db: Session) -> None:
+    user, tokens = create_logged_in_user(client, db)
+    headers = token_headers(tokens)
+    user_cache.clear()
+    token_cache.clear()
+    # the current user, the revoked tokens added since the last refresh of the
+    # filter, the requested user is the current one and is not loaded again
+    with query_budget(2):
+        r = client.get(f"{settings.API_V1_STR}/users/{user.id}", headers=headers)
+    assert r.status_code == 200
@@ -4,10 +4,11 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, delete
 
+from app.core.cache import caches
 from app.core.config import settings
 from app.core.db import engine, init_db
 from app.main import app
-from app.models import Item, User
+from app.models import Event, Group, Lecture, Post, User
 from app.tests.utils.user import authentication_token_from_email
 from app.tests.utils.utils import get_superuser_token_headers
 
@@ -17,7 +18,13 @@ def db() -> Generator[Session, None, None]:
     with Session(engine) as session:
         init_db(session)
         yield session
-        statement = delete(Item)
+        statement = delete(Event)
+        session.execute(statement)
+        statement = delete(Lecture)
+        session.execute(statement)
+        statement = delete(Post)
+        session.execute(statement)
+        statement = delete(Group)
         session.execute(statement)
         statement = delete(User)
         session.execute(statement)
@@ -40,3 +47,9 @@ def normal_user_token_headers(client: TestClient, db: Session) -> dict[str, str]
     return authentication_token_from_email(
         client=client, email=settings.EMAIL_TEST_USER, db=db
     )
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> None:
+    for cache in caches:
+        cache.clear()
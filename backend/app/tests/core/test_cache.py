@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+from app.core.cache import CachedResponse, ResponseCache, TTLCache, caches
+
+
+def test_ttl_cache_expires_entries() -> None:
+    cache: TTLCache[str, int] = TTLCache("test", maxsize=10, ttl=60)
+    with patch("time.monotonic", return_value=0):
+        cache.set("a", 1)
+    with patch("time.monotonic", return_value=59):
+        assert cache.get("a") == 1
+    with patch("time.monotonic", return_value=60):
+        assert cache.get("a") is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    cache: TTLCache[str, int] = TTLCache("test", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_only_the_caches_of_the_app_are_reported() -> None:
+    cache: TTLCache[str, int] = TTLCache("test", maxsize=2, ttl=60)
+    responses = ResponseCache("test", maxsize=2, ttl=60)
+    assert [c.name for c in caches] == ["responses", "tokens", "users"]
+    assert cache not in caches
+    assert responses.entries not in caches
+
+
+def test_response_cache_invalidates_namespaces() -> None:
+    cache = ResponseCache("test", maxsize=10, ttl=60)
+    response = CachedResponse(status=200, headers=[], body=b"{}")
+    cache.set(("posts", "/posts", ""), response, cache.generation("posts"))
+    cache.set(("events", "/events", ""), response, cache.generation("events"))
+    cache.invalidate("posts")
+    assert cache.get(("posts", "/posts", "")) is None
+    assert cache.get(("events", "/events", "")) is response
+
+
+def test_response_cache_drops_responses_computed_before_a_write() -> None:
+    cache = ResponseCache("test", maxsize=10, ttl=60)
+    generation = cache.generation("posts")
+    cache.invalidate("posts")
+    response = CachedResponse(status=200, headers=[], body=b"{}")
+    cache.set(("posts", "/posts", ""), response, generation)
+    assert cache.get(("posts", "/posts", "")) is None
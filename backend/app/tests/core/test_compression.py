@@ -0,0 +1,66 @@
+import gzip
+
+import brotli  # type: ignore[import-untyped]
+from fastapi.testclient import TestClient
+
+from app.core.cache import CachedResponse
+from app.core.compression import compressible, encoded_headers, negotiate, vary
+from app.core.config import settings
+
+JSON = [(b"content-type", b"application/json"), (b"content-length", b"4096")]
+
+
+def test_negotiate_prefers_brotli() -> None:
+    assert negotiate("gzip, deflate, br") == "br"
+    assert negotiate("gzip, deflate") == "gzip"
+    assert negotiate("br;q=0.5, gzip") == "gzip"
+    assert negotiate("*") == "br"
+    assert negotiate("br;q=0, *;q=0.1") == "gzip"
+
+
+def test_negotiate_identity() -> None:
+    assert negotiate("") is None
+    assert negotiate("identity") is None
+    assert negotiate("deflate") is None
+    assert negotiate("gzip;q=0, br;q=invalid") is None
+
+
+def test_compressible() -> None:
+    assert compressible(JSON, 4096)
+    assert not compressible(JSON, 10)
+    assert not compressible([(b"content-type", b"image/png")], 4096)
+    assert not compressible([*JSON, (b"content-encoding", b"gzip")], 4096)
+
+
+def test_encoded_headers() -> None:
+    headers = encoded_headers(JSON, "gzip", 100)
+    assert dict(headers) == {
+        b"content-type": b"application/json",
+        b"content-length": b"100",
+        b"content-encoding": b"gzip",
+        b"vary": b"Accept-Encoding",
+    }
+    assert vary([(b"vary", b"Origin")]) == [(b"vary", b"Origin, Accept-Encoding")]
+    assert vary(headers) == headers
+
+
+def test_cached_response_is_compressed_once() -> None:
+    body = b'{"posts": []}' * 200
+    response = CachedResponse(status=200, headers=JSON, body=body)
+    headers, encoded = response.encode("br")
+    assert brotli.decompress(encoded) == body
+    assert dict(headers)[b"content-length"] == str(len(encoded)).encode()
+    assert response.encode("br")[1] is encoded
+    assert gzip.decompress(response.encode("gzip")[1]) == body
+    assert set(response.encoded) == {"br", "gzip"}
+
+
+def test_uncached_responses_are_compressed(client: TestClient) -> None:
+    url = f"{settings.API_V1_STR}/openapi.json"
+    r = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert "x-cache" not in r.headers
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.json()["paths"]
+    r = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in r.headers
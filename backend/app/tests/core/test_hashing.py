@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.hashing import HashingBusy, HashingPool
+
+
+def test_hashing_pool_rejects_calls_beyond_its_queue() -> None:
+    pool = HashingPool(workers=1, max_queue=1)
+    release = threading.Event()
+    with ThreadPoolExecutor(2) as callers:
+        running = callers.submit(pool.run, release.wait, 5)
+        queued = callers.submit(pool.run, release.wait, 5)
+        while pool.stats()["queued"] < 1:
+            time.sleep(0.01)
+        with pytest.raises(HashingBusy) as e:
+            pool.run(str, 1)
+        assert e.value.retry_after >= 1
+        release.set()
+        assert running.result() and queued.result()
+
+    stats = pool.stats()
+    assert stats["completed"] == 2
+    assert stats["rejected"] == 1
+    assert stats["queued"] == stats["running"] == 0
+    assert pool.run(str, 1) == "1"
+
+
+def test_hashing_pool_awaits_without_holding_a_thread() -> None:
+    pool = HashingPool(workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main() -> list[bool]:
+        # Every call waits on the event loop thread
+        calls = [
+            asyncio.ensure_future(pool.run_async(release.wait, 5)) for _ in range(2)
+        ]
+        while pool.stats()["queued"] < 1:
+            await asyncio.sleep(0.01)
+        with pytest.raises(HashingBusy):
+            await pool.run_async(str, 1)
+        release.set()
+        return await asyncio.gather(*calls)
+
+    assert asyncio.run(main()) == [True, True]
+    stats = pool.stats()
+    assert stats["completed"] == 2
+    assert stats["rejected"] == 1
+    assert stats["queued"] == stats["running"] == 0
@@ -0,0 +1,50 @@
+import time
+from collections.abc import Generator
+
+import pytest
+
+from app.core.cache import CachedResponse, ResponseCache
+from app.core.db import engine
+from app.core.invalidation import InvalidationListener, publish
+
+POSTS = ("posts", "/posts", "")
+EVENTS = ("events", "/events", "")
+
+
+@pytest.fixture()
+def listener() -> Generator[InvalidationListener, None, None]:
+    cache = ResponseCache("test", maxsize=10, ttl=60)
+    response = CachedResponse(status=200, headers=[], body=b"{}")
+    cache.set(POSTS, response, cache.generation("posts"))
+    cache.set(EVENTS, response, cache.generation("events"))
+    listener = InvalidationListener(engine, cache, poll_interval=0.1)
+    listener.start()
+    assert listener.ready.wait(timeout=5)
+    yield listener
+    listener.stop()
+
+
+def wait_for_eviction(cache: ResponseCache, key: tuple[str, str, str]) -> bool:
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if cache.get(key) is None:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_listener_evicts_namespaces_published_by_other_workers(
+    listener: InvalidationListener,
+) -> None:
+    listener.worker_id = "another-worker"
+    publish(engine, ["posts"])
+    assert wait_for_eviction(listener.cache, POSTS)
+    assert listener.cache.get(EVENTS) is not None
+
+
+def test_listener_ignores_its_own_notifications(
+    listener: InvalidationListener,
+) -> None:
+    publish(engine, ["posts"])
+    time.sleep(0.5)
+    assert listener.cache.get(POSTS) is not None
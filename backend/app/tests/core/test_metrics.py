@@ -0,0 +1,30 @@
+from app.core.metrics import Gauge, Histogram
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(("a",), value)
+    histogram.observe(('say "hi"',), 0.2)
+    assert list(histogram.render()) == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="a",le="0.1"} 2',
+        'latency_seconds_bucket{route="a",le="1"} 3',
+        'latency_seconds_bucket{route="a",le="+Inf"} 4',
+        'latency_seconds_sum{route="a"} 3.65',
+        'latency_seconds_count{route="a"} 4',
+        'latency_seconds_bucket{route="say \\"hi\\"",le="0.1"} 0',
+        'latency_seconds_bucket{route="say \\"hi\\"",le="1"} 1',
+        'latency_seconds_bucket{route="say \\"hi\\"",le="+Inf"} 1',
+        'latency_seconds_sum{route="say \\"hi\\""} 0.2',
+        'latency_seconds_count{route="say \\"hi\\""} 1',
+    ]
+
+
+def test_gauge() -> None:
+    gauge = Gauge("in_flight", "In flight.")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+    assert list(gauge.render())[-1] == "in_flight 1"
@@ -0,0 +1,109 @@
+from collections.abc import Generator
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import Session, delete, select
+
+from app.core.db import engine
+from app.core.outbox import EmailDispatcher, queue_email
+from app.models import EmailOutbox
+from app.tests.utils.smtp import SMTPServer, debug_smtp_server
+from app.tests.utils.utils import random_email
+
+
+@pytest.fixture
+def smtp(db: Session) -> Generator[SMTPServer, None, None]:
+    db.execute(delete(EmailOutbox))
+    db.commit()
+    with (
+        debug_smtp_server() as server,
+        patch("app.core.config.settings.SMTP_HOST", "127.0.0.1"),
+        patch("app.core.config.settings.SMTP_PORT", server.server_address[1]),
+        patch("app.core.config.settings.SMTP_TLS", False),
+        patch("app.core.config.settings.SMTP_USER", None),
+        patch("app.core.config.settings.SMTP_PASSWORD", None),
+        patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
+    ):
+        yield server
+
+
+def dispatcher(max_attempts: int = 3) -> EmailDispatcher:
+    return EmailDispatcher(
+        engine, batch_size=10, poll_interval=1, max_attempts=max_attempts
+    )
+
+
+def queue(db: Session) -> EmailOutbox:
+    return queue_email(
+        session=db, email_to=random_email(), subject="Hello", html_content="<p>Hi</p>"
+    )
+
+
+def test_dispatcher_sends_a_batch_over_one_connection(
+    db: Session, smtp: SMTPServer
+) -> None:
+    emails = [queue(db) for _ in range(3)]
+
+    assert dispatcher().dispatch() == 3
+    assert smtp.mailbox.connections == 1
+    assert sorted(to[0] for to, _ in smtp.mailbox.messages) == sorted(
+        email.email_to for email in emails
+    )
+    for email in emails:
+        db.refresh(email)
+        assert email.status == "sent"
+        assert email.sent_at
+        assert email.html_content == ""
+    assert dispatcher().dispatch() == 0
+
+
+def test_dispatcher_retries_with_backoff(db: Session, smtp: SMTPServer) -> None:
+    email = queue(db)
+    smtp.mailbox.reject = 1
+
+    assert dispatcher().dispatch() == 1
+    db.refresh(email)
+    assert email.status == "pending"
+    assert email.attempts == 1
+    assert email.last_error
+    assert email.next_attempt_at > datetime.now()
+    # Not due yet
+    assert dispatcher().dispatch() == 0
+
+    email.next_attempt_at = datetime.now()
+    db.add(email)
+    db.commit()
+    assert dispatcher().dispatch() == 1
+    db.refresh(email)
+    assert email.status == "sent"
+    assert email.attempts == 2
+    assert len(smtp.mailbox.messages) == 1
+
+
+def test_dispatcher_gives_up_after_max_attempts(db: Session, smtp: SMTPServer) -> None:
+    email = queue(db)
+    smtp.mailbox.reject = 1
+
+    assert dispatcher(max_attempts=1).dispatch() == 1
+    db.refresh(email)
+    assert email.status == "failed"
+    assert email.last_error
+    assert email.html_content == ""
+
+
+@pytest.mark.usefixtures("smtp")
+def test_dispatcher_skips_emails_claimed_by_another_worker(db: Session) -> None:
+    claimed = queue(db)
+    free = queue(db)
+    with Session(engine) as other_worker:
+        statement = (
+            select(EmailOutbox).where(EmailOutbox.id == claimed.id).with_for_update()
+        )
+        other_worker.exec(statement).one()
+
+        assert dispatcher().dispatch() == 1
+    db.refresh(claimed)
+    db.refresh(free)
+    assert claimed.status == "pending"
+    assert free.status == "sent"
@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.pool import TimedQueuePool, collect_pool_stats, engine_options
+
+
+def test_statement_timeout_is_set_on_new_connections() -> None:
+    with engine.connect() as connection:
+        timeout = connection.execute(text("SHOW statement_timeout")).scalar_one()
+    assert timeout == f"{settings.POSTGRES_STATEMENT_TIMEOUT_MS // 1000}s"
+
+
+def test_pgbouncer_mode_disables_prepared_statements() -> None:
+    with patch.object(settings, "POSTGRES_PGBOUNCER", True):
+        options = engine_options()
+    assert options["connect_args"] == {"prepare_threshold": None}
+
+
+def test_each_engine_has_its_own_pool_size() -> None:
+    with (
+        patch.object(settings, "POSTGRES_POOL_SIZE", 3),
+        patch.object(settings, "POSTGRES_MAX_OVERFLOW", 1),
+        patch.object(settings, "POSTGRES_ASYNC_POOL_SIZE", 2),
+        patch.object(settings, "POSTGRES_ASYNC_MAX_OVERFLOW", 0),
+    ):
+        sync, async_ = engine_options(), engine_options(is_async=True)
+    assert (sync["pool_size"], sync["max_overflow"]) == (3, 1)
+    assert (async_["pool_size"], async_["max_overflow"]) == (2, 0)
+
+
+def test_pool_records_checkout_waits_and_timeouts() -> None:
+    small = create_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI),
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    with small.connect():
+        stats = collect_pool_stats("small", small)
+        assert stats["checked_out"] == 1
+        with pytest.raises(exc.TimeoutError):
+            small.connect()
+    stats = collect_pool_stats("small", small)
+    assert stats["max_overflow"] == 0
+    assert stats["checked_out"] == 0
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["wait_seconds_max"] >= 0.1
+    small.dispose()
@@ -0,0 +1,56 @@
+import json
+import logging
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import Session, text
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.querystats import QueryStats, current_query_stats, normalize_sql
+
+
+def test_normalize_sql() -> None:
+    statement = """
+        SELECT post.id, post.title FROM post
+        WHERE post.group_id = %(group_id_1)s AND post.title = 'it''s'
+          AND post.id IN (%(id_1_1)s, %(id_1_2)s, %(id_1_3)s)
+        LIMIT 101
+    """
+    assert normalize_sql(statement) == (
+        "SELECT post.id, post.title FROM post WHERE post.group_id = ? "
+        "AND post.title = ? AND post.id IN (...) LIMIT ?"
+    )
+
+
+def test_statements_are_counted_for_the_current_request(db: Session) -> None:
+    stats = QueryStats(request="GET /")
+    token = current_query_stats.set(stats)
+    try:
+        db.exec(text("SELECT 1"))  # type: ignore[call-overload]
+        db.exec(text("SELECT 2"))  # type: ignore[call-overload]
+    finally:
+        current_query_stats.reset(token)
+    db.exec(text("SELECT 3"))  # type: ignore[call-overload]
+    assert stats.count == 2
+    assert stats.seconds > 0
+
+
+def test_slow_statements_are_logged(caplog: pytest.LogCaptureFixture) -> None:
+    token = current_query_stats.set(QueryStats(request="GET /slow"))
+    try:
+        with (
+            patch.object(settings, "SLOW_QUERY_THRESHOLD_MS", 10),
+            caplog.at_level(logging.WARNING, logger="app.core.querystats"),
+            engine.connect() as connection,
+        ):
+            connection.exec_driver_sql("SELECT pg_sleep(0.02)")
+            connection.exec_driver_sql("SELECT 1")
+    finally:
+        current_query_stats.reset(token)
+    [record] = caplog.records
+    entry = json.loads(record.getMessage())
+    assert entry["event"] == "slow_query"
+    assert entry["request"] == "GET /slow"
+    assert entry["statement"] == "SELECT pg_sleep(?)"
+    assert entry["duration_ms"] >= 10
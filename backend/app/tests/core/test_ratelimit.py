@@ -0,0 +1,25 @@
+from unittest.mock import patch
+
+from app.core.ratelimit import RateLimiter
+
+
+def test_rate_limiter_refills_buckets() -> None:
+    limiter = RateLimiter("test", rate=0.5, burst=2, maxsize=10)
+    with patch("app.core.ratelimit.time.monotonic", return_value=100.0):
+        assert limiter.acquire("a") == 0
+        assert limiter.acquire("a") == 0
+        assert limiter.acquire("a") == 2
+        # other keys have their own bucket
+        assert limiter.acquire("b") == 0
+    with patch("app.core.ratelimit.time.monotonic", return_value=102.0):
+        assert limiter.acquire("a") == 0
+        assert limiter.acquire("a") == 2
+    assert limiter.allowed == 4
+    assert limiter.limited == 2
+
+
+def test_rate_limiter_forgets_least_recently_used_keys() -> None:
+    limiter = RateLimiter("test", rate=0.001, burst=1, maxsize=1)
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("b") == 0
+    assert limiter.acquire("a") == 0
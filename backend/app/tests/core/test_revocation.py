@@ -0,0 +1,66 @@
+import uuid
+from datetime import datetime, timedelta
+
+from sqlmodel import Session
+
+from app.core.db import engine
+from app.core.revocation import BloomFilter, RevocationList
+from app.models import RevokedToken
+from app.tests.utils.utils import count_queries
+
+
+def test_bloom_filter_has_no_false_negatives() -> None:
+    bloom = BloomFilter(1000, 0.01)
+    items = [uuid.uuid4().hex for _ in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+    others = [uuid.uuid4().hex for _ in range(10_000)]
+    false_positives = sum(item in bloom for item in others)
+    assert false_positives < 300
+
+
+def revoke(db: Session, *, expires_in: timedelta = timedelta(minutes=5)) -> str:
+    jti = uuid.uuid4().hex
+    db.add(RevokedToken(jti=jti, expires_at=datetime.now() + expires_in))
+    db.commit()
+    return jti
+
+
+def test_revocation_list_loads_tokens_revoked_by_other_workers(db: Session) -> None:
+    revocations = RevocationList(
+        capacity=100, error_rate=0.01, refresh_interval=60, rebuild_interval=600
+    )
+    first = revoke(db)
+    assert revocations.is_revoked(db, first)
+    entries = revocations.stats()["entries"]
+
+    second = revoke(db)
+    # Not refreshed yet
+    assert not revocations.is_revoked(db, second)
+    revocations.refresh(db, force=True)
+    assert revocations.is_revoked(db, second)
+    assert revocations.stats()["entries"] == entries + 1
+
+
+def test_revocation_list_skips_the_database_for_live_tokens(db: Session) -> None:
+    revocations = RevocationList(
+        capacity=100, error_rate=0.01, refresh_interval=60, rebuild_interval=600
+    )
+    revocations.refresh(db)
+    with count_queries(engine) as statements:
+        assert not revocations.is_revoked(db, uuid.uuid4().hex)
+    assert statements == []
+
+
+def test_revocation_list_rebuild_drops_expired_tokens(db: Session) -> None:
+    revocations = RevocationList(
+        capacity=100, error_rate=0.01, refresh_interval=60, rebuild_interval=0
+    )
+    revocations.refresh(db)
+    entries = revocations.stats()["entries"]
+    expired = revoke(db, expires_in=timedelta(seconds=-1))
+    revocations.add(expired)
+    assert revocations.stats()["entries"] == entries + 1
+    revocations.refresh(db, force=True)
+    assert revocations.stats()["entries"] == entries
@@ -1,9 +1,11 @@
 from fastapi.encoders import jsonable_encoder
+from passlib.hash import bcrypt
 from sqlmodel import Session
 
 from app import crud
-from app.core.security import verify_password
+from app.core.security import pwd_context, verify_password
 from app.models import User, UserCreate, UserUpdate
+from app.tests.utils.user import random_user_in
 from app.tests.utils.utils import random_email, random_lower_string
 
 
@@ -89,3 +91,36 @@ def test_update_user(db: Session) -> None:
     assert user_2
     assert user.email == user_2.email
     assert verify_password(new_password, user_2.hashed_password)
+
+
+def test_authenticate_upgrades_legacy_bcrypt_hash(db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=random_user_in(email=email, password=password)
+    )
+    assert user.hashed_password.startswith("$argon2id$")
+    user.hashed_password = bcrypt.using(rounds=4).hash(password)
+    db.add(user)
+    db.commit()
+
+    authenticated_user = crud.authenticate(session=db, email=email, password=password)
+    assert authenticated_user
+    assert authenticated_user.hashed_password.startswith("$argon2id$")
+    assert not pwd_context.needs_update(authenticated_user.hashed_password)
+    assert verify_password(password, authenticated_user.hashed_password)
+    db.refresh(user)
+    assert user.hashed_password == authenticated_user.hashed_password
+
+
+def test_authenticate_keeps_current_hash(db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=random_user_in(email=email, password=password)
+    )
+    hashed_password = user.hashed_password
+
+    crud.authenticate(session=db, email=email, password=password)
+    db.refresh(user)
+    assert user.hashed_password == hashed_password
@@ -0,0 +1,105 @@
+from collections.abc import Generator
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy import insert, text
+from sqlmodel import Session, col, delete, select
+
+from app.api.routes import events, lectures, posts
+from app.models import Event, Group, Lecture, Post
+from app.tests.utils.post import create_random_group
+
+ROWS = 5000
+
+
+@pytest.fixture(scope="module")
+def group(db: Session) -> Generator[Group, None, None]:
+    """
+    Seed enough posts, lectures and events for the planner to prefer an
+    index over a sequential scan when one matches the query.
+    """
+    groups = [create_random_group(db) for _ in range(10)]
+    group_ids = [g.id for g in groups]
+    now = datetime.now()
+    db.execute(
+        insert(Post),
+        [
+            {
+                "title": f"post {i}",
+                "group_id": group_ids[i % len(group_ids)],
+                "is_visible": i % 5 != 0,
+                "created_at": now - timedelta(minutes=i),
+                "last_updated": now,
+            }
+            for i in range(ROWS)
+        ],
+    )
+    post_ids = db.exec(
+        select(Post.id).where(col(Post.group_id).in_(group_ids)).order_by(col(Post.id))
+    ).all()
+    # Lectures of a course are created together with it
+    for table, rows in ((Lecture, ROWS * 4), (Event, ROWS)):
+        db.execute(
+            insert(table),
+            [
+                {
+                    "title": f"{table.__name__} {i}",
+                    "start": now + timedelta(hours=i),
+                    "end": now + timedelta(hours=i + 2),
+                    "location": "ITU",
+                    "is_visible": i % 5 != 0,
+                    "post_id": post_ids[i * len(post_ids) // rows],
+                }
+                for i in range(rows)
+            ],
+        )
+    db.commit()
+    for table_name in ("post", "lecture", "event"):
+        db.execute(text(f"ANALYZE {table_name}"))
+    yield groups[0]
+    db.execute(delete(Event).where(col(Event.location) == "ITU"))
+    db.execute(delete(Post).where(col(Post.group_id).in_(group_ids)))
+    db.commit()
+
+
+def explain(db: Session, statement: Any) -> str:
+    compiled = statement.compile(
+        dialect=db.get_bind().dialect, compile_kwargs={"render_postcompile": True}
+    )
+    plan = db.connection().exec_driver_sql(f"EXPLAIN {compiled}", compiled.params)
+    return "\n".join(plan.scalars())
+
+
+def test_public_posts_use_visible_index(db: Session, group: Group) -> None:
+    statement = select(Post).where(Post.group_id == group.id, Post.is_visible == True)  # noqa: E712
+    plan = explain(db, posts.keyset.apply(statement, None).limit(101))
+    assert "ix_post_group_id_created_at_visible" in plan
+
+
+def test_admin_posts_use_group_index(db: Session, group: Group) -> None:
+    statement = select(Post).where(Post.group_id == group.id)
+    plan = explain(db, posts.keyset.apply(statement, None).limit(101))
+    assert "ix_post_group_id_created_at " in plan
+
+
+def test_post_lectures_use_post_id_index(db: Session, group: Group) -> None:
+    post_ids = db.exec(
+        select(Post.id).where(Post.group_id == group.id).limit(100)
+    ).all()
+    statement = select(Lecture).where(col(Lecture.post_id).in_(post_ids))
+    assert "ix_lecture_post_id" in explain(db, statement)
+
+
+@pytest.mark.usefixtures("group")
+def test_public_lectures_use_visible_index(db: Session) -> None:
+    statement = select(Lecture).where(Lecture.is_visible == True)  # noqa: E712
+    plan = explain(db, lectures.keyset.apply(statement, None).limit(101))
+    assert "ix_lecture_start_visible" in plan
+
+
+@pytest.mark.usefixtures("group")
+def test_public_events_use_visible_index(db: Session) -> None:
+    statement = select(Event).where(Event.is_visible == True)  # noqa: E712
+    plan = explain(db, events.keyset.apply(statement, None).limit(101))
+    assert "ix_event_start_visible" in plan
@@ -0,0 +1,23 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import Session
+
+from app.models import Event
+from app.tests.utils.utils import random_lower_string
+
+
+def create_random_event(db: Session, *, is_visible: bool = True) -> Event:
+    start = datetime.now() + timedelta(days=7)
+    event = Event(
+        title=random_lower_string(),
+        description=random_lower_string(),
+        content=random_lower_string(),
+        location=random_lower_string(),
+        start=start,
+        end=start + timedelta(hours=2),
+        is_visible=is_visible,
+    )
+    db.add(event)
+    db.commit()
+    db.refresh(event)
+    return event
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import Session
+
+from app.models import Group, Lecture, Post
+from app.tests.utils.utils import random_lower_string
+
+
+def create_random_group(db: Session) -> Group:
+    group = Group(name=random_lower_string(), description=random_lower_string())
+    db.add(group)
+    db.commit()
+    db.refresh(group)
+    return group
+
+
+def create_random_post(
+    db: Session, *, group: Group, lectures: int = 0, is_visible: bool = True
+) -> Post:
+    now = datetime.now()
+    post = Post(
+        title=random_lower_string(),
+        description=random_lower_string(),
+        content=random_lower_string(),
+        is_visible=is_visible,
+        group_id=group.id,
+        created_at=now,
+    )
+    for i in range(lectures):
+        post.lectures.append(
+            Lecture(
+                title=random_lower_string(),
+                start=now + timedelta(days=i),
+                end=now + timedelta(days=i, hours=2),
+                location=random_lower_string(),
+            )
+        )
+    db.add(post)
+    db.commit()
+    db.refresh(post)
+    return post
@@ -0,0 +1,75 @@
+import socketserver
+import threading
+from collections.abc import Generator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Mailbox:
+    messages: list[tuple[list[str], bytes]] = field(default_factory=list)
+    connections: int = 0
+    # Answer DATA of the next `reject` messages with a temporary failure
+    reject: int = 0
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    server: "SMTPServer"
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        mailbox = self.server.mailbox
+        mailbox.connections += 1
+        recipients: list[str] = []
+        self.reply("220 localhost debug SMTP")
+        for raw in self.rfile:
+            command = raw.decode().strip()
+            verb = command[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.partition(":")[2].strip(" <>"))
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b"".join(iter(lambda: self.rfile.readline(), b".\r\n"))
+                if mailbox.reject > 0:
+                    mailbox.reject -= 1
+                    self.reply("451 Try again later")
+                else:
+                    mailbox.messages.append((recipients, data))
+                    self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.mailbox = Mailbox()
+
+
+@contextmanager
+def debug_smtp_server() -> Generator[SMTPServer, None, None]:
+    """
+    Plain SMTP server on a free local port, keeping the messages it receives.
+    """
+    server = SMTPServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -19,14 +19,46 @@ def user_authentication_headers(
     return headers
 
 
+def random_user_in(*, email: str, password: str) -> UserCreate:
+    return UserCreate(
+        email=email,
+        password=password,
+        full_name=random_lower_string(),
+        photo_url="N/A",
+        role="member",
+        department="N/A",
+    )
+
+
 def create_random_user(db: Session) -> User:
     email = random_email()
     password = random_lower_string()
-    user_in = UserCreate(email=email, password=password)
+    user_in = random_user_in(email=email, password=password)
     user = crud.create_user(session=db, user_create=user_in)
     return user
 
 
+def create_logged_in_user(
+    client: TestClient, db: Session
+) -> tuple[User, dict[str, str]]:
+    """
+    Create a user and log it in, return it with the tokens of its login.
+    """
+    email = random_email()
+    password = random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=random_user_in(email=email, password=password)
+    )
+    data = {"username": email, "password": password}
+    r = client.post(f"{settings.API_V1_STR}/login/access-token", data=data)
+    assert r.status_code == 200
+    return user, r.json()
+
+
+def token_headers(tokens: dict[str, str]) -> dict[str, str]:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
 def authentication_token_from_email(
     *, client: TestClient, email: str, db: Session
 ) -> dict[str, str]:
@@ -38,7 +70,7 @@ def authentication_token_from_email(
     password = random_lower_string()
     user = crud.get_user_by_email(session=db, email=email)
     if not user:
-        user_in_create = UserCreate(email=email, password=password)
+        user_in_create = random_user_in(email=email, password=password)
         user = crud.create_user(session=db, user_create=user_in_create)
     else:
         user_in_update = UserUpdate(password=password)
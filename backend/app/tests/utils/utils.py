@@ -1,9 +1,14 @@
 import random
 import string
+from collections.abc import Generator
+from contextlib import contextmanager
+from typing import Any
 
 from fastapi.testclient import TestClient
+from sqlalchemy import Engine, event
 
 from app.core.config import settings
+from app.core.db import async_engine, engine
 
 
 def random_lower_string() -> str:
@@ -24,3 +29,39 @@ def get_superuser_token_headers(client: TestClient) -> dict[str, str]:
     a_token = tokens["access_token"]
     headers = {"Authorization": f"Bearer {a_token}"}
     return headers
+
+
+@contextmanager
+def count_queries(*engines: Engine) -> Generator[list[str], None, None]:
+    """
+    Collect every SQL statement sent to the database through `engines`.
+    """
+    statements: list[str] = []
+
+    def record(*args: Any) -> None:
+        statements.append(args[2])
+
+    for target in engines:
+        event.listen(target, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", record)
+
+
+@contextmanager
+def query_budget(budget: int) -> Generator[list[str], None, None]:
+    """
+    Fail when the block sends more than `budget` statements to the database
+    through either engine.
+
+    Route tests wrap their request in it with the budget of the endpoint, so
+    a relationship that starts being lazy loaded row by row fails them.
+    """
+    with count_queries(engine, async_engine.sync_engine) as statements:
+        yield statements
+    listing = "\n".join(f"{i}. {sql}" for i, sql in enumerate(statements, 1))
+    assert (
+        len(statements) <= budget
+    ), f"{len(statements)} statements over a budget of {budget}:\n{listing}"
@@ -0,0 +1,413 @@
+"""
+Run scripted scenarios against the app in process and report the throughput
+and the latency percentiles of every route, as a table and as JSON so that
+two runs can be diffed.
+
+- `anonymous` browses the posts of a group (both views, two cursor pages),
+  a post, the events, an event, the lectures and the groups.
+- `member` browses the same pages logged in, past the response cache.
+- `admin` edits a post, then creates, edits and deletes an event.
+- `login` logs the seeded users in, all workers at once.
+
+The scenarios use the rows of `scripts/seed.py`, `--seed-data` replaces them
+first. Every iteration draws its requests from its own `random.Random`, so
+the same `--seed` sends the same requests whatever the concurrency.
+
+    python scripts/benchmark.py --seed-data -c 20 -n 200 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import subprocess
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any
+
+import httpx
+import seed as seeding
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.main import app
+
+API = settings.API_V1_STR
+PAGE_SIZE = 20
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+@dataclass
+class Sample:
+    route: str
+    seconds: float
+    error: bool
+    # From the `Server-Timing` header, `None` when the response has none
+    queries: int | None
+
+
+@dataclass
+class Recorder:
+    """
+    Client of the scenarios, timing every request under the unique id of the
+    route it targets.
+    """
+
+    client: httpx.AsyncClient
+    samples: list[Sample] = field(default_factory=list)
+
+    async def request(
+        self,
+        route: str,
+        method: str,
+        url: str,
+        *,
+        expect: tuple[int, ...] = (200,),
+        **kwargs: Any,
+    ) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.client.request(method, API + url, **kwargs)
+        seconds = time.perf_counter() - start
+        match = _QUERIES.search(response.headers.get("server-timing", ""))
+        self.samples.append(
+            Sample(
+                route=route,
+                seconds=seconds,
+                error=response.status_code not in expect,
+                queries=int(match.group(1)) if match else None,
+            )
+        )
+        return response
+
+
+Scenario = Callable[[Recorder, random.Random], Awaitable[None]]
+
+
+def browse(seeded: seeding.Seeded, headers: dict[str, str]) -> Scenario:
+    """
+    Anonymous requests without `headers` are mostly answered by the public
+    response cache, a member's always reach the routes.
+    """
+
+    async def run(client: Recorder, rng: random.Random) -> None:
+        # Some posts and events are hidden, anonymous users get a 404 for them
+        params = {
+            "group": rng.choice(seeded.group_ids),
+            "view": rng.choice(("full", "summary")),
+            "pagination": "cursor",
+            "limit": PAGE_SIZE,
+        }
+        response = await client.request(
+            "posts-read_posts", "GET", "/posts/", params=params, headers=headers
+        )
+        cursor = response.json().get("next_cursor")
+        if cursor:
+            await client.request(
+                "posts-read_posts",
+                "GET",
+                "/posts/",
+                params={**params, "after": cursor},
+                headers=headers,
+            )
+        await client.request(
+            "posts-read_post",
+            "GET",
+            f"/posts/{rng.choice(seeded.post_ids)}",
+            expect=(200, 404),
+            headers=headers,
+        )
+        await client.request(
+            "events-read_events",
+            "GET",
+            "/events/",
+            params={"view": rng.choice(("full", "summary")), "limit": PAGE_SIZE},
+            headers=headers,
+        )
+        await client.request(
+            "events-read_event",
+            "GET",
+            f"/events/{rng.choice(seeded.event_ids)}",
+            expect=(200, 404),
+            headers=headers,
+        )
+        await client.request(
+            "lectures-read_lectures",
+            "GET",
+            "/lectures/",
+            params={"limit": PAGE_SIZE},
+            headers=headers,
+        )
+        await client.request("groups-read_groups", "GET", "/groups/", headers=headers)
+
+    return run
+
+
+def admin(seeded: seeding.Seeded, headers: dict[str, str]) -> Scenario:
+    async def run(client: Recorder, rng: random.Random) -> None:
+        start = datetime(2024, 9, 1, 18, 0) + timedelta(days=rng.randrange(365))
+        await client.request(
+            "posts-update_post",
+            "PUT",
+            f"/posts/{rng.choice(seeded.post_ids)}",
+            headers=headers,
+            json={
+                "title": f"{seeding.PREFIX}{seeding.sentence(rng, 5)}",
+                "description": seeding.sentence(rng, 20),
+                "content": seeding.sentence(rng, 600),
+                "group_id": rng.choice(seeded.group_ids),
+            },
+        )
+        event = {
+            "title": f"{seeding.PREFIX}{seeding.sentence(rng, 5)}",
+            "description": seeding.sentence(rng, 20),
+            "content": seeding.sentence(rng, 600),
+            "location": seeding.sentence(rng, 2),
+            "start": start.isoformat(),
+            "end": (start + timedelta(hours=3)).isoformat(),
+        }
+        response = await client.request(
+            "events-create_event", "POST", "/events/", headers=headers, json=event
+        )
+        if response.status_code != 200:
+            return
+        id = response.json()["id"]
+        await client.request(
+            "events-update_event",
+            "PUT",
+            f"/events/{id}",
+            headers=headers,
+            json={**event, "location": seeding.sentence(rng, 2)},
+        )
+        await client.request(
+            "events-delete_event", "DELETE", f"/events/{id}", headers=headers
+        )
+
+    return run
+
+
+def login(seeded: seeding.Seeded) -> Scenario:
+    async def run(client: Recorder, rng: random.Random) -> None:
+        # A 503 from a full hashing queue counts as an error
+        await client.request(
+            "login-login_access_token",
+            "POST",
+            "/login/access-token",
+            data={
+                "username": rng.choice(seeded.user_emails),
+                "password": seeding.BENCHMARK_PASSWORD,
+            },
+        )
+
+    return run
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    scenario: Scenario,
+    *,
+    concurrency: int,
+    iterations: int,
+    warmup: int,
+    seed: int,
+) -> dict[str, Any]:
+    async def workers(recorder: Recorder, first: int, count: int) -> float:
+        queue = list(range(first, first + count))
+
+        async def worker() -> None:
+            while queue:
+                rng = random.Random(f"{seed}-{name}-{queue.pop()}")
+                await scenario(recorder, rng)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+    await workers(Recorder(client), iterations, warmup)
+    recorder = Recorder(client)
+    seconds = await workers(recorder, 0, iterations)
+    return summarize(recorder.samples, seconds)
+
+
+def percentile(values: list[float], p: float) -> float:
+    """
+    Nearest-rank percentile of sorted `values`.
+    """
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+def summarize(samples: list[Sample], seconds: float) -> dict[str, Any]:
+    routes: dict[str, list[Sample]] = {}
+    for sample in samples:
+        routes.setdefault(sample.route, []).append(sample)
+    report: dict[str, Any] = {
+        "requests": len(samples),
+        "errors": sum(sample.error for sample in samples),
+        "seconds": round(seconds, 3),
+        "throughput": round(len(samples) / seconds, 1) if seconds else 0.0,
+        "routes": {},
+    }
+    for route, route_samples in sorted(routes.items()):
+        latencies = sorted(sample.seconds * 1000 for sample in route_samples)
+        queries = [s.queries for s in route_samples if s.queries is not None]
+        report["routes"][route] = {
+            "requests": len(route_samples),
+            "errors": sum(sample.error for sample in route_samples),
+            "throughput": round(len(route_samples) / seconds, 1) if seconds else 0.0,
+            "mean_ms": round(sum(latencies) / len(latencies), 2),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "queries_mean": round(sum(queries) / len(queries), 2) if queries else None,
+            "queries_max": max(queries) if queries else None,
+        }
+    return report
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print(
+        f"{'route':<28} {'req':>6} {'err':>5} {'req/s':>8}"
+        f" {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}"
+    )
+    for name, scenario in report["scenarios"].items():
+        print(
+            f"{name} ({scenario['requests']} requests, {scenario['errors']} errors,"
+            f" {scenario['throughput']} req/s)"
+        )
+        for route, stats in scenario["routes"].items():
+            queries = stats["queries_mean"]
+            print(
+                f"  {route:<26} {stats['requests']:>6} {stats['errors']:>5}"
+                f" {stats['throughput']:>8} {stats['p50_ms']:>8} {stats['p95_ms']:>8}"
+                f" {stats['p99_ms']:>8} {'-' if queries is None else queries:>8}"
+            )
+
+
+SCENARIOS = ("anonymous", "member", "admin", "login")
+
+
+@dataclass
+class Profile:
+    scenarios: list[str] = field(default_factory=lambda: list(SCENARIOS))
+    concurrency: int = 10
+    # Per scenario
+    iterations: int = 100
+    warmup: int = 10
+    seed: int = 0
+
+
+async def authorization(client: httpx.AsyncClient, email: str) -> dict[str, str]:
+    response = await client.post(
+        f"{API}/login/access-token",
+        data={"username": email, "password": seeding.BENCHMARK_PASSWORD},
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def run(
+    profile: Profile, volumes: seeding.Volumes | None = None
+) -> dict[str, Any]:
+    """
+    Run the scenarios of `profile`, on freshly seeded `volumes` or on the rows
+    of a previous run when `None`.
+    """
+    with Session(engine) as session:
+        if volumes:
+            seeding.reset(session)
+            seeded = seeding.seed(session, volumes, seed=profile.seed)
+        else:
+            seeded = seeding.load(session)
+    if not seeded.post_ids or not seeded.event_ids or not seeded.user_emails:
+        raise SystemExit("No seeded data, run with --seed-data or scripts/seed.py")
+
+    report: dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            **asdict(profile),
+            "volumes": asdict(volumes) if volumes else None,
+        },
+        "scenarios": {},
+    }
+    transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark", timeout=60
+    ) as client:
+        scenarios: dict[str, Scenario] = {
+            "anonymous": browse(seeded, {}),
+            "login": login(seeded),
+        }
+        if "member" in profile.scenarios:
+            headers = await authorization(client, seeded.user_emails[-1])
+            scenarios["member"] = browse(seeded, headers)
+        if "admin" in profile.scenarios:
+            headers = await authorization(client, seeded.admin_email)
+            scenarios["admin"] = admin(seeded, headers)
+        for name in profile.scenarios:
+            report["scenarios"][name] = await run_scenario(
+                client,
+                name,
+                scenarios[name],
+                concurrency=profile.concurrency,
+                iterations=profile.iterations,
+                warmup=profile.warmup,
+                seed=profile.seed,
+            )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    profile = Profile()
+    parser.add_argument("-c", "--concurrency", type=int, default=profile.concurrency)
+    parser.add_argument(
+        "-n",
+        "--iterations",
+        type=int,
+        default=profile.iterations,
+        help="Iterations per scenario",
+    )
+    parser.add_argument("--warmup", type=int, default=profile.warmup)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=SCENARIOS, default=profile.scenarios
+    )
+    parser.add_argument("--seed", type=int, default=profile.seed)
+    parser.add_argument("--seed-data", action="store_true")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    defaults = seeding.Volumes()
+    for name, default in vars(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    args = parser.parse_args()
+    volumes = seeding.Volumes(**{name: getattr(args, name) for name in vars(defaults)})
+
+    profile = Profile(**{name: getattr(args, name) for name in vars(profile)})
+    report = asyncio.run(run(profile, volumes if args.seed_data else None))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
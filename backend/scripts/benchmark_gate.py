@@ -0,0 +1,161 @@
+"""
+Run the benchmark with a fixed profile on freshly seeded data and compare
+every route with the committed baseline. Fail when a route got slower at
+p95 or sends more statements than the baseline allows, when it answered with
+errors, or when it is missing from the run.
+
+Latencies depend on the machine, record the baseline on the one that runs
+the gate:
+
+    python scripts/benchmark_gate.py --update
+    python scripts/benchmark_gate.py --tolerance 0.3 --query-tolerance 0
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import seed as seeding
+from benchmark import Profile, run
+from sqlmodel import Session
+
+from app.core.db import engine
+
+BASELINE = Path(__file__).with_name("benchmark_baseline.json")
+PROFILE = Profile(concurrency=2, iterations=100, warmup=10, seed=0)
+VOLUMES = seeding.Volumes(users=50, groups=4, posts=500, events=200)
+# Absolute slack on top of the relative tolerances, so that routes answered
+# in a millisecond or from the cache do not fail on noise
+SLACK_MS = 5.0
+QUERY_SLACK = 0.25
+
+
+@dataclass
+class Tolerances:
+    latency: float
+    queries: float
+
+
+def check(
+    baseline: dict[str, Any] | None,
+    current: dict[str, Any] | None,
+    tolerances: Tolerances,
+) -> list[str]:
+    """
+    Regressions of one route, empty when it passes.
+    """
+    if current is None:
+        return ["missing"]
+    problems = []
+    if current["errors"]:
+        problems.append(f"{current['errors']} errors")
+    if baseline is None:
+        return problems
+    if current["p95_ms"] > baseline["p95_ms"] * (1 + tolerances.latency) + SLACK_MS:
+        problems.append("p95")
+    if (
+        current["queries_mean"] is not None
+        and baseline["queries_mean"] is not None
+        and current["queries_mean"]
+        > baseline["queries_mean"] * (1 + tolerances.queries) + QUERY_SLACK
+    ):
+        problems.append("queries")
+    return problems
+
+
+def value(stats: dict[str, Any] | None, name: str) -> float | None:
+    return stats[name] if stats else None
+
+
+def cell(value: float | None) -> str:
+    return "-" if value is None else str(value)
+
+
+def change(old: float | None, new: float | None) -> str:
+    if old is None or new is None:
+        return "-"
+    if not old:
+        return "+inf%" if new else "+0%"
+    return f"{(new - old) / old:+.0%}"
+
+
+def compare(
+    baseline: dict[str, Any], report: dict[str, Any], tolerances: Tolerances
+) -> bool:
+    """
+    Print a row per route of both reports, return whether all of them pass.
+    """
+    print(
+        f"{'route':<36} {'p95 ms':>8} {'now':>8} {'diff':>6}"
+        f" {'queries':>8} {'now':>8} {'diff':>6}  result"
+    )
+    passed = True
+    for scenario in sorted({*baseline["scenarios"], *report["scenarios"]}):
+        old_routes = baseline["scenarios"].get(scenario, {}).get("routes", {})
+        new_routes = report["scenarios"].get(scenario, {}).get("routes", {})
+        for route in sorted({*old_routes, *new_routes}):
+            old, new = old_routes.get(route), new_routes.get(route)
+            problems = check(old, new, tolerances)
+            passed = passed and not problems
+            result = "FAIL " + ", ".join(problems) if problems else "ok"
+            if old is None and not problems:
+                result = "new"
+            columns = []
+            for name in ("p95_ms", "queries_mean"):
+                before, after = value(old, name), value(new, name)
+                columns.append(
+                    f" {cell(before):>8} {cell(after):>8} {change(before, after):>6}"
+                )
+            print(f"{scenario + '/' + route:<36}{''.join(columns)}  {result}")
+    return passed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument(
+        "--update", action="store_true", help="Replace the baseline with this run"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="Allowed relative increase of the p95 latency",
+    )
+    parser.add_argument(
+        "--query-tolerance",
+        type=float,
+        default=0.1,
+        help="Allowed relative increase of the mean statements per request",
+    )
+    args = parser.parse_args()
+
+    try:
+        report = asyncio.run(run(PROFILE, VOLUMES))
+    finally:
+        with Session(engine) as session:
+            seeding.reset(session)
+
+    if args.update:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    tolerances = Tolerances(latency=args.tolerance, queries=args.query_tolerance)
+    if not compare(baseline, report, tolerances):
+        print(f"Regressions against the baseline of {baseline['meta']['commit']}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
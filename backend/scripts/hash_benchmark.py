@@ -0,0 +1,71 @@
+"""
+Measure how many password hashes one core computes per second for a grid of
+argon2id and bcrypt parameters, to pick the `ARGON2_*` and `BCRYPT_ROUNDS`
+settings for the hardware the API runs on.
+
+    python scripts/hash_benchmark.py --memory 19456 47104 --time 1 2 3 --rounds 10 12
+
+The hashes run one at a time on a single thread, multiply by
+`PASSWORD_HASH_WORKERS` for the login throughput of one API worker.
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+
+from passlib.hash import argon2, bcrypt
+
+PASSWORD = "correct horse battery staple"
+
+
+def measure(hash_password: Callable[[str], str], seconds: float) -> list[float]:
+    durations: list[float] = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline or len(durations) < 3:
+        start = time.perf_counter()
+        hash_password(PASSWORD)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def report(name: str, durations: list[float]) -> None:
+    median = statistics.median(durations)
+    print(
+        f"  {name:<32} {1 / median:8.1f} hashes/s"
+        f"  median {median * 1000:7.1f} ms  max {max(durations) * 1000:7.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--memory", type=int, nargs="+", default=[19456, 47104])
+    parser.add_argument("--time", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--parallelism", type=int, default=1)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 12])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    # Subclasses made by `using()` before the backend is loaded fail to load it
+    argon2.get_backend()
+    print("argon2id")
+    for memory_cost in args.memory:
+        for time_cost in args.time:
+            handler = argon2.using(
+                type="ID",
+                memory_cost=memory_cost,
+                rounds=time_cost,
+                parallelism=args.parallelism,
+            )
+            report(
+                f"m={memory_cost} KiB t={time_cost} p={args.parallelism}",
+                measure(handler.hash, args.seconds),
+            )
+    print("bcrypt")
+    for rounds in args.rounds:
+        handler = bcrypt.using(rounds=rounds)
+        report(f"rounds={rounds}", measure(handler.hash, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Send concurrent GET requests to one endpoint and report the throughput and
+the latency percentiles, to compare two builds of the API under the same load.
+
+    python scripts/load_test.py http://localhost:8000/api/v1/posts/ -c 200 -n 5000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    url: str,
+    remaining: list[int],
+    latencies: list[float],
+    errors: list[str],
+) -> None:
+    while remaining[0] > 0:
+        remaining[0] -= 1
+        start = time.perf_counter()
+        try:
+            response = await client.get(url)
+            if response.status_code != 200:
+                errors.append(str(response.status_code))
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(url: str, concurrency: int, requests: int) -> None:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        # Warm up the connection pools of the client and of the server
+        await asyncio.gather(
+            *(client.get(url) for _ in range(concurrency)), return_exceptions=True
+        )
+        remaining = [requests]
+        latencies: list[float] = []
+        errors: list[str] = []
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                worker(client, url, remaining, latencies, errors)
+                for _ in range(concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f"{url} concurrency={concurrency} requests={len(latencies)}")
+    print(f"  throughput {len(latencies) / elapsed:.1f} req/s")
+    print(
+        f"  latency p50 {percentiles[49] * 1000:.1f} ms"
+        f" p95 {percentiles[94] * 1000:.1f} ms"
+        f" p99 {percentiles[98] * 1000:.1f} ms"
+    )
+    print(f"  errors {len(errors)} {dict(Counter(errors))}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("url")
+    parser.add_argument("-c", "--concurrency", type=int, default=100)
+    parser.add_argument("-n", "--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    main()
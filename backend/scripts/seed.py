@@ -0,0 +1,262 @@
+"""
+Fill the database with synthetic users, groups, posts, lectures and events
+for the benchmarks. The same `--seed` always generates the same rows.
+
+Seeded rows are recognizable (`@benchmark.example.com` emails, `bench-`
+group names and titles) and `--reset` deletes the ones of a previous run.
+Every seeded user has the password `BENCHMARK_PASSWORD`, the first one is a
+superuser.
+
+    python scripts/seed.py --reset --users 200 --posts 2000 --events 500
+"""
+
+import argparse
+import random
+import time
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert
+from sqlmodel import Session, col, select
+
+from app.core.db import engine
+from app.core.security import get_password_hash
+from app.models import Event, Group, Lecture, Post, User
+
+BENCHMARK_PASSWORD = "benchmark-password"
+EMAIL_DOMAIN = "benchmark.example.com"
+PREFIX = "bench-"
+WORDS = (
+    "algorithm graph tree heap queue stack array string hash dynamic greedy "
+    "search sort prefix segment binary flow matching geometry number theory "
+    "contest problem solution workshop lecture session weekly team practice"
+).split()
+
+
+@dataclass
+class Volumes:
+    users: int = 100
+    groups: int = 4
+    posts: int = 500
+    lectures_per_post: int = 3
+    events: int = 200
+    # Words of the content of posts and events, about 8 bytes each
+    content_words: int = 600
+
+
+@dataclass
+class Seeded:
+    admin_email: str
+    user_emails: list[str]
+    group_ids: list[int]
+    post_ids: list[int]
+    event_ids: list[int]
+    lecture_ids: list[int]
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words)).capitalize()
+
+
+def ids(rows: Iterable[int | None]) -> list[int]:
+    # Primary keys are optional on the models, never on the rows
+    return [id for id in rows if id is not None]
+
+
+def reset(session: Session) -> None:
+    """
+    Delete the rows of a previous run, posts take their lectures with them.
+    """
+    groups = select(col(Group.id)).where(col(Group.name).startswith(PREFIX))
+    session.execute(delete(Post).where(col(Post.group_id).in_(groups)))
+    session.execute(delete(Group).where(col(Group.name).startswith(PREFIX)))
+    session.execute(delete(Event).where(col(Event.title).startswith(PREFIX)))
+    session.execute(delete(User).where(col(User.email).endswith(f"@{EMAIL_DOMAIN}")))
+    session.commit()
+
+
+def seed(session: Session, volumes: Volumes, *, seed: int = 0) -> Seeded:
+    rng = random.Random(seed)
+    now = datetime(2024, 9, 1, 12, 0)
+    # One hash for everyone, hashing each password would dominate the run
+    hashed_password = get_password_hash(BENCHMARK_PASSWORD)
+
+    emails = [f"user{i}@{EMAIL_DOMAIN}" for i in range(volumes.users)]
+    users = [
+        {
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "email": email,
+            "hashed_password": hashed_password,
+            "is_active": True,
+            "is_superuser": i == 0,
+            "is_public": rng.random() < 0.5,
+            "full_name": sentence(rng, 2),
+            "photo_url": "N/A",
+            "role": "admin" if i == 0 else "member",
+            "department": sentence(rng, 1),
+        }
+        for i, email in enumerate(emails)
+    ]
+    if users:
+        session.execute(insert(User), users)
+    user_ids = [user["id"] for user in users] or [None]
+
+    group_ids: list[int] = []
+    if volumes.groups:
+        group_ids = ids(
+            session.scalars(
+                insert(Group).returning(col(Group.id)),
+                [
+                    {"name": f"{PREFIX}group-{i}", "description": sentence(rng, 8)}
+                    for i in range(volumes.groups)
+                ],
+            )
+        )
+
+    def audit(created_at: datetime) -> dict[str, object]:
+        author = rng.choice(user_ids)
+        return {
+            "created_at": created_at,
+            "created_by": author,
+            "last_updated": created_at,
+            "updated_by": author,
+        }
+
+    post_ids: list[int] = []
+    if group_ids and volumes.posts:
+        post_ids = ids(
+            session.scalars(
+                insert(Post).returning(col(Post.id)),
+                [
+                    {
+                        "title": f"{PREFIX}{sentence(rng, 5)}",
+                        "description": sentence(rng, 20),
+                        "content": sentence(rng, volumes.content_words),
+                        "image": f"https://example.com/{i}.png",
+                        "is_visible": rng.random() < 0.9,
+                        "group_id": rng.choice(group_ids),
+                        **audit(now - timedelta(hours=i)),
+                    }
+                    for i in range(volumes.posts)
+                ],
+            )
+        )
+
+    lecture_ids: list[int] = []
+    lectures = [
+        {
+            "title": f"{PREFIX}{sentence(rng, 4)}",
+            "start": now + timedelta(days=7 * j, hours=i % 24),
+            "end": now + timedelta(days=7 * j, hours=i % 24 + 2),
+            "location": sentence(rng, 2),
+            "is_visible": True,
+            "post_id": post_id,
+            **audit(now),
+        }
+        for i, post_id in enumerate(post_ids)
+        for j in range(volumes.lectures_per_post)
+    ]
+    if lectures:
+        lecture_ids = ids(
+            session.scalars(insert(Lecture).returning(col(Lecture.id)), lectures)
+        )
+
+    event_ids: list[int] = []
+    if volumes.events:
+        event_ids = ids(
+            session.scalars(
+                insert(Event).returning(col(Event.id)),
+                [
+                    {
+                        "title": f"{PREFIX}{sentence(rng, 5)}",
+                        "description": sentence(rng, 20),
+                        "content": sentence(rng, volumes.content_words),
+                        "image": f"https://example.com/event-{i}.png",
+                        "is_visible": rng.random() < 0.9,
+                        "location": sentence(rng, 2),
+                        "start": now + timedelta(days=i),
+                        "end": now + timedelta(days=i, hours=3),
+                        **audit(now - timedelta(days=i)),
+                    }
+                    for i in range(volumes.events)
+                ],
+            )
+        )
+    session.commit()
+    return Seeded(
+        admin_email=emails[0] if emails else "",
+        user_emails=emails,
+        group_ids=group_ids,
+        post_ids=post_ids,
+        event_ids=event_ids,
+        lecture_ids=lecture_ids,
+    )
+
+
+def load(session: Session) -> Seeded:
+    """
+    The rows of a previous run.
+    """
+    groups = select(col(Group.id)).where(col(Group.name).startswith(PREFIX))
+    emails = list(
+        session.exec(
+            select(User.email)
+            .where(col(User.email).endswith(f"@{EMAIL_DOMAIN}"))
+            .order_by(col(User.is_superuser).desc(), col(User.email))
+        )
+    )
+    return Seeded(
+        admin_email=emails[0] if emails else "",
+        user_emails=emails,
+        group_ids=ids(session.exec(groups.order_by(col(Group.id)))),
+        post_ids=ids(
+            session.exec(
+                select(col(Post.id))
+                .where(col(Post.group_id).in_(groups))
+                .order_by(col(Post.id))
+            )
+        ),
+        event_ids=ids(
+            session.exec(
+                select(col(Event.id))
+                .where(col(Event.title).startswith(PREFIX))
+                .order_by(col(Event.id))
+            )
+        ),
+        lecture_ids=ids(
+            session.exec(
+                select(col(Lecture.id))
+                .join(Post)
+                .where(col(Post.group_id).in_(groups))
+                .order_by(col(Lecture.id))
+            )
+        ),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    defaults = Volumes()
+    for name, default in vars(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reset", action="store_true")
+    args = parser.parse_args()
+    volumes = Volumes(**{name: getattr(args, name) for name in vars(defaults)})
+
+    start = time.perf_counter()
+    with Session(engine) as session:
+        if args.reset:
+            reset(session)
+        seeded = seed(session, volumes, seed=args.seed)
+    print(
+        f"seeded users={len(seeded.user_emails)} groups={len(seeded.group_ids)}"
+        f" posts={len(seeded.post_ids)} lectures={len(seeded.lecture_ids)}"
+        f" events={len(seeded.event_ids)} in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
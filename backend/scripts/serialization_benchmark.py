@@ -0,0 +1,109 @@
+"""
+Serialize a page of posts with their group and lectures the way FastAPI does
+for a returned model (dump, validate against the response model, encode) and
+through the precompiled serializer of the route, and report the pages per
+second of both.
+
+    python scripts/serialization_benchmark.py -n 200 --posts 100
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.responses import posts_public
+from app.models import Group, Lecture, Post, PostsPublic
+
+CONTENT = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 90
+
+
+def make_page(posts: int) -> PostsPublic:
+    now = datetime(2024, 9, 1, 18, 0)
+    user_id = uuid.uuid4()
+    group = Group(id=3, name="Course", description="Weekly lectures")
+    rows = []
+    for i in range(posts):
+        post = Post(
+            id=i,
+            title=f"Post {i}",
+            description="A post about algorithms",
+            content=CONTENT,
+            image="https://example.com/image.png",
+            group_id=group.id,
+            created_by=user_id,
+            updated_by=user_id,
+        )
+        post.group = group
+        post.lectures = [
+            Lecture(
+                id=i * 10 + j,
+                title=f"Lecture {j}",
+                start=now + timedelta(days=7 * j),
+                end=now + timedelta(days=7 * j, hours=2),
+                location="EEB 5102",
+                post_id=i,
+                created_by=user_id,
+                updated_by=user_id,
+            )
+            for j in range(3)
+        ]
+        rows.append(post)
+    return PostsPublic(posts=rows, count=posts, has_more=True, next_cursor="cursor")
+
+
+def measure(name: str, serialize: Callable[[], bytes], pages: int) -> float:
+    start = time.perf_counter()
+    for _ in range(pages):
+        serialize()
+    elapsed = time.perf_counter() - start
+    print(
+        f"  {name:<12} {pages / elapsed:10.1f} pages/s"
+        f"  {elapsed / pages * 1e3:8.2f} ms/page"
+    )
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--pages", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=100)
+    args = parser.parse_args()
+
+    page = make_page(args.posts)
+    field = create_response_field(name="Response_read_posts", type_=PostsPublic)
+    loop = asyncio.new_event_loop()
+
+    def response_model(response_class: type[JSONResponse]) -> Callable[[], bytes]:
+        def serialize() -> bytes:
+            content = loop.run_until_complete(
+                serialize_response(field=field, response_content=page)
+            )
+            return bytes(response_class(content).body)
+
+        return serialize
+
+    def serializer() -> bytes:
+        return bytes(posts_public.response(page).body)
+
+    expected = posts_public.adapter.validate_json(serializer())
+    assert (
+        posts_public.adapter.validate_json(response_model(JSONResponse)()) == expected
+    )
+    size = len(serializer())
+    print(f"posts={args.posts} body={size / 1024:.0f} KiB pages={args.pages}")
+    before = measure("json", response_model(JSONResponse), args.pages)
+    measure("orjson", response_model(ORJSONResponse), args.pages)
+    after = measure("serializer", serializer, args.pages)
+    print(f"  speedup {before / after:.1f}x")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Render the password recovery email in a loop, reading and compiling the
+template on every render as before, and through the precompiled template
+registry, and report the renders per second of both.
+
+    python scripts/template_benchmark.py -n 2000
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from jinja2 import Template
+
+from app.utils import compile_email_templates, render_email_template
+
+TEMPLATE_NAME = "reset_password.html"
+CONTEXT = {
+    "project_name": "ITU ACM",
+    "username": "user@example.com",
+    "email": "user@example.com",
+    "valid_hours": 48,
+    "link": "https://example.com/reset-password?token=token",
+}
+BUILD = Path(__file__).parents[1] / "app" / "email-templates" / "build"
+
+
+def render_from_disk(*, template_name: str, context: dict[str, Any]) -> str:
+    # The previous render_email_template
+    template_str = (BUILD / template_name).read_text()
+    return Template(template_str).render(context)
+
+
+def measure(name: str, render: Callable[..., str], renders: int) -> float:
+    start = time.perf_counter()
+    for _ in range(renders):
+        render(template_name=TEMPLATE_NAME, context=CONTEXT)
+    elapsed = time.perf_counter() - start
+    print(
+        f"  {name:<12} {renders / elapsed:10.1f} renders/s"
+        f"  {elapsed / renders * 1e6:8.1f} us/render"
+    )
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--renders", type=int, default=2000)
+    args = parser.parse_args()
+
+    compile_email_templates()
+    assert render_from_disk(
+        template_name=TEMPLATE_NAME, context=CONTEXT
+    ) == render_email_template(template_name=TEMPLATE_NAME, context=CONTEXT)
+    print(f"{TEMPLATE_NAME} renders={args.renders}")
+    before = measure("from disk", render_from_disk, args.renders)
+    after = measure("registry", render_email_template, args.renders)
+    print(f"  speedup {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,3 +6,8 @@ set -x
 coverage run --source=app -m pytest
 coverage report --show-missing
 coverage html --title "${@-coverage}"
+
+# Opt in, latencies are only comparable on the machine that recorded the baseline
+if [ -n "${BENCHMARK_GATE-}" ]; then
+    python scripts/benchmark_gate.py
+fi